@@ -0,0 +1,90 @@
+import argparse
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+import typing
+
+# times fuzzy lookups as a single run does them (a fresh cache file per lookup) and as the resident server does
+# (an in-memory cache kept across lookups), with either scorer
+# usage: python benchmarks/bench_fuzzy.py [--names 1000000] [--root /usr]
+
+_GoPath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "go.py")
+_Spec = importlib.util.spec_from_file_location("go", _GoPath)
+go = importlib.util.module_from_spec(_Spec)
+_Spec.loader.exec_module(go)
+
+Targets = ["pyhton", "gti", "libssl", "setuptols", "complx", "README", "vmi", "ls", "configure.ac", "libpython3.so"]
+
+
+def GetNames(root: str, count: int) -> typing.List[str]:
+    # real file names, repeated with a numbered stem once they run out
+    base = []
+    for (_, _, files) in os.walk(root):
+        base.extend(files)
+        if len(base) >= count:
+            break
+    if not base:
+        raise SystemExit("no files under " + root)
+
+    names = base[:count]
+    i = len(names)
+    while len(names) < count:
+        (stem, extension) = os.path.splitext(base[i % len(base)])
+        names.append("%s%d%s" % (stem, i // len(base), extension))
+        i += 1
+    return names
+
+
+def Measure(openCache: typing.Callable[[], "go.MatchCacheBase"], vectorized: bool, resident: bool) \
+        -> typing.Tuple[float, float, int]:
+    # a single run opens the cache for its one lookup; the resident server keeps it, and its indexes, across lookups
+    # returns the first lookup's time (including building any index), the average time of the rest, and the matches
+    matchCache = openCache()
+    times = []
+    found = 0
+    for target in Targets:
+        if not resident:
+            matchCache.Close()
+            matchCache = openCache()
+        matchCache.vectorized = vectorized
+        matcher = go.TargetMatcher(target, True, False, False)
+        start = time.perf_counter()
+        found += len(matchCache.GetFuzzyMatches(matcher))
+        times.append(time.perf_counter() - start)
+    matchCache.Close()
+    return (times[0], sum(times[1:]) / (len(times) - 1), found)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--names", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--root", default=sys.prefix)
+    arguments = parser.parse_args()
+
+    go.config = go.GoConfig()
+    scorers = [("trigram", False)]
+    if go.VectorizedScorer.IsAvailable():
+        scorers.append(("vectorized", True))
+    else:
+        print("numpy is not installed; only the trigram path is measured")
+
+    print("%10s  %-16s  %-10s  %12s  %14s  %8s" % ("names", "cache", "scorer", "first lookup", "later lookups", "matches"))
+    with tempfile.TemporaryDirectory() as directory:
+        for count in arguments.names:
+            names = GetNames(arguments.root, count)
+            items = [go.MatchCacheItem("/d%d/%s" % (i % 100, name), name) for (i, name) in enumerate(names)]
+            cachePath = os.path.join(directory, "%d.cache" % count)
+            go.MatchCacheFile.Write(cachePath, go.MatchCache(time.time(), items))
+            sources = [("file, single run", lambda: go.MatchCacheFile(cachePath), False),
+                       ("memory, resident", lambda: go.MatchCache(time.time(), items), True)]
+
+            for (cache, openCache, resident) in sources:
+                for (scorer, vectorized) in scorers:
+                    (first, later, found) = Measure(openCache, vectorized, resident)
+                    print("%10d  %-16s  %-10s  %10.0fms  %12.1fms  %8d" % (count, cache, scorer, first * 1000, later * 1000, found))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import importlib.util
+import os
+import statistics
+import sys
+import time
+import typing
+
+# times PathScanner over PATH plus a recursively targeted tree, cold (nothing known, every directory is listed)
+# and warm (reusing the previous scan's directories, like a cache refresh where nothing changed)
+# usage: python benchmarks/bench_scan.py [--root /usr/lib] [--threads 1 4] [--repeat 5]
+
+_GoPath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "go.py")
+_Spec = importlib.util.spec_from_file_location("go", _GoPath)
+go = importlib.util.module_from_spec(_Spec)
+_Spec.loader.exec_module(go)
+
+
+def Scan(config: "go.GoConfig", sources, threads: int,
+         knownDirectories: typing.Optional[typing.Dict[typing.Tuple[str, bool], "go.DirectoryCacheItem"]]) \
+        -> typing.Tuple[float, int, typing.Dict[typing.Tuple[str, bool], "go.DirectoryCacheItem"]]:
+    # same steps as ScanSources, minus the deduplication
+    start = time.perf_counter()
+    count = 0
+    with go.PathScanner(config.TargetedExtensions, config.IncludeAnyExecutables, config.IncludeHidden,
+                        config.IgnoreGofilters, knownDirectories, threads) as scanner:
+        for source in sources:
+            scanner.Prefetch(*source)
+        for source in sources:
+            count += len(scanner.ScanPaths(*source))
+    return (time.perf_counter() - start, count, scanner.ScannedDirectories)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--root", default=os.path.join(sys.prefix, "lib"))
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--repeat", type=int, default=5)
+    arguments = parser.parse_args()
+
+    go.config = config = go.GoConfig()
+    sources = [
+        (os.environ.get("PATH", "").split(os.pathsep), False, None),
+        ([arguments.root], True, None),
+    ]
+
+    print("%8s  %-5s  %10s  %10s  %12s" % ("threads", "scan", "median", "best", "files"))
+    for threads in arguments.threads:
+        (_, _, knownDirectories) = Scan(config, sources, threads, None)
+        for (mode, known) in [("cold", None), ("warm", knownDirectories)]:
+            times = []
+            for _ in range(arguments.repeat):
+                (elapsed, count, _) = Scan(config, sources, threads, known)
+                times.append(elapsed)
+            print("%8d  %-5s  %8.0fms  %8.0fms  %12d" % (threads, mode, statistics.median(times) * 1000,
+                                                        min(times) * 1000, count))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,18 +6,27 @@ GO_VERSION_DATE = "26.03.25.06"
 
 CURRENT_VERSION = (GO_VERSION_REVISION, GO_VERSION_DATE)
 
+import array
+import bisect
+import collections
+import concurrent.futures
+import copy
 import ctypes
 import difflib
 import enum
 import fnmatch
+import hashlib
+import heapq
 import importlib.util
 import itertools
 import json
+import math
+import mmap
 import os
-import pickle
 # import py_compile below
 import queue
 import shutil
+import socket
 import subprocess
 import tempfile
 import threading
@@ -25,9 +34,16 @@ import time
 import typing
 import shlex
 import stat
+import struct
 import sys
 import unicodedata
 import urllib.request
+import zlib
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
 
 # optional requirements:
 
@@ -67,9 +83,20 @@ try:
 except:
     pass
 
+NUMPY_AVAILABLE = False
+numpy = None # slow to import, so only imported once needed; see VectorizedScorer.IsAvailable
+try:
+    NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+except:
+    pass
+
 
 config: "GoConfig" = None
 
+FUZZY_MATCH_THRESHOLD = 0.7
+FUZZY_TRIGRAM_SHARE = 0.25 # of the target's trigrams, that a name must have to be scored at all
+CACHE_REBUILD_TIMEOUT = 120 # seconds to wait for another go that is building the same path cache
+
 MAX_QUIET_LEVEL = 3
 MAX_VERBOSE_LEVEL = 2
 PRINT_LEVEL = 0
@@ -120,8 +147,15 @@ def PrintHelp():
     print("  AutoPapplyPipes [truthy]: if stdin is a pipe, automatically set the first argument to papply automatically (/autopipe)")
     print("  AutoSilentPipe [truthy]: if stdout is a pipe, silence all output. Additionally, if stdin is a pipe, pass /yes.")
     print("  NoFuzzyMatch [truthy]: always set /nofuzzy")
+    print("  AlwaysLazy [truthy]: always set /lazy")
     print("  IncludeHidden [truthy]: specify whether to include hidden files and directories")
     print("  CacheInvalidationTime [float]: override the default cache invalidation time with the specified one, in hours")
+    print("  ScanThreads [int]: number of threads used to walk the searched directories; 1 scans them sequentially")
+    print("  CacheSlots [int]: number of path caches kept for different search settings; least recently used ones are removed")
+    print("  CacheSizeLimit [float]: maximum total size of the kept path caches, in MB")
+    print("  MemoSize [int]: number of resolved targets remembered while using the path cache; 0 disables it")
+    print("  ServerRevalidationTime [float]: how often a /server polls searched directories for changes, in seconds")
+    print("                                  on Linux, directories are watched with inotify and only polled if that fails")
     print("  DefaultArguments [list[str]]: prepend the given arguments before any command line arguments every go run")
     print()
     print("Environment variables:")
@@ -145,7 +179,7 @@ def PrintHelp():
     print("                By default, Windows excludes them, and UNIX includes them.")
     print("/hidden[+-]   : Includes or excludes hidden files and directories. Omitting + or - toggles the setting.")
     print()
-    print(">>> Any of the previous commands will temporarily disable the path cache.")
+    print(">>> Any of the previous commands will use a separate path cache for those settings.")
     print()
     print("/regex        : Matches the files by regex instead of filenames.")
     print("/wild         : Matches the files by UNIX-like wildcards instead of filenames.")
@@ -154,11 +188,24 @@ def PrintHelp():
     print()
     print("/cache[+-]    : Instruct go whether to use the path cache. By default, it is not used.")
     print("                Will be created if not already existing, or if more than one week old.")
+    print("                Once expired, only the directories that changed since the last refresh are rescanned.")
     print("                Speeds up target lookup if you have a wide path.")
-    print("/refresh      : Manually refresh the path cache.")
+    print("                The last resolved path of a target is remembered (per directory and settings), and reused")
+    print("                while that file exists and its directory is unchanged.")
+    print("                Only one go rebuilds an expired cache at a time; the others keep using the expired one meanwhile.")
+    print("                Caches are kept in $XDG_CACHE_HOME/go.caches (usually ~/.cache/go.caches),")
+    print("                or %LOCALAPPDATA%\\go.caches on Windows.")
+    print("/refresh      : Manually refresh the path cache, rescanning every directory.")
+    print("/server       : Keep running in the background and resolve targets for other go instances. (UNIX only)")
+    print("                While it runs, go looks up targets through it, unless /cache- is used.")
+    print("/server-stop  : Stop a running go server.")
     print("/nofuzzy      : Disable fuzzy matching, speeding up target search.")
+    print("/lazy         : Search PATH, the current directory and then the searched paths in order, and run the first")
+    print("                exact match, without scanning the rest. Everything is only scanned if nothing matches")
+    print("                and fuzzy matching is enabled. Doesn't use the path cache.")
     print("/duplinks     : Include symlinks to executables that were already found.")
     print("/nofilters    : Ignore gofilter files.")
+    print(">>> Like the search settings above, these two also use a separate path cache.")
     print()
     print("/quiet        : Supresses any messages (but not exceptions) from this script. /yes is implied.")
     print("                Repeat the \"q\" to suppress more messages (eg. /qqquiet). Maximum is " + str(MAX_QUIET_LEVEL) + " q's.")
@@ -173,6 +220,15 @@ def PrintHelp():
     print("/dry          : Does not actually run the target executable.")
     print("/list         : Alias for /echo + /dry.")
     print("/target       : Print only the target and exit. Implies /qmax and /dry.")
+    print("/which        : Resolve every remaining argument as a target, and print the results as JSON. Implies /qmax.")
+    print("                If there are no arguments, the targets are read from stdin, one per line.")
+    print("                Every result has the target, a status (found, ambiguous or missing), the chosen match,")
+    print("                the exact matches and the fuzzy alternatives. Exits with 1 if any target wasn't found.")
+    print("/which-nul    : Like /which, but targets on stdin, and the printed fields, are NUL-separated. Every result is")
+    print("                the target, status, chosen match (or empty), then the count and list of exact matches,")
+    print("                and the count and list of fuzzy alternatives.")
+    print("/complete-XX  : Print the indexed names (and stems) starting with XX, one per line, for shell completion.")
+    print("                Uses the path cache even if it expired, without checking for changes. Implies /qmax.")
     print("/autopipe     : If stdin is a pipe, automatically set the first argument to papply if not already.")
     print("/autosilent   : If stdout is a pipe, silence all output")
     print()
@@ -192,6 +248,10 @@ def PrintHelp():
     print("/parallel     : Starts all instances, and then waits for all. Valid only with /*apply argument.")
     print("/limit-XX     : Limits parallel runs to have at most XX targets running at once.")
     print("/batch-XX     : Batches parallel runs in sizes of XX. Valid only after /parallel.")
+    print("/stream       : Start runs as soon as their apply arguments are available, instead of after reading every list.")
+    print("                Lists are read lazily, so /papply can run while stdin is still being written to.")
+    print("                Modifiers that need a whole list (s, fl, g, py) buffer only that list. Not used with")
+    print("                /repeat, /rollover, /crossjoin or tsp, which buffer every list instead.")
     print("/shell        : Run the command through the default shell interpreter. Allows for any target.")
     print("/asscript     : Passes all commands to the default shell interpreter, as a file. Incompatible with most modifiers.")
     print("                Overrides the target to be run with the default shell interpreter, and allows for any target.")
@@ -206,6 +266,8 @@ def PrintHelp():
     print("/rollover[+-] : Sets apply parameters to run as many times as possible.")
     print("                + (default) and - control whether to repeat source lists that are smaller, or to pass empty.")
     print("/crossjoin    : Cross-joins all apply lists, resulting in all possible argument combinations.")
+    print("/compact      : Stores apply lists as utf-8 buffers instead of separate strings, using a lot less memory for")
+    print("                very large lists, but a bit more time. Does nothing with /stream.")
     print("/[type]apply  : For every line in the specified source, runs the target with the line added as arguments.")
     print("                If no inline markers (see below) are specified, all arguments are appended to the end.")
     print("                Accepts a number of modifiers with +[modifier], after any apply-specific arguments.")
@@ -420,15 +482,869 @@ class MatchCacheItem():
         self.path = path
         self.filename = filename
         self.linkTarget : typing.Optional[str] = None
+        self.fileId: typing.Optional[typing.Tuple[int, int]] = None # (st_dev, st_ino), of the link's target for symlinks
+
+class DirectoryCacheItem():
+    def __init__(self, path: str, recursive: bool):
+        self.path = path
+        self.recursive = recursive
+        self.stamp: typing.Optional[typing.Tuple[int, int, int]] = None # (st_dev, st_ino, st_mtime_ns); None if missing
+        self.filterStamp: typing.Optional[typing.Tuple[str, int, int]] = None # (name, st_mtime_ns, st_size)
+        self.files: typing.List[MatchCacheItem] = []
+        self.directories: typing.List[str] = []
+        self.subIncludes: typing.List[str] = []
+
+        # sub-path excludes of the gofilters above this directory, split into the path components left to match
+        self.gofilter: typing.Optional["GoFilter"] = None
+        self.inheritedExcludes: "GoFilter.SubExcludesType" = ()
+
+    @property
+    def Missing(self) -> bool:
+        return self.stamp is None
+
+    def GetChildExcludes(self, path: str) -> "GoFilter.SubExcludesType":
+        subExcludes = self.inheritedExcludes
+        if self.gofilter is not None:
+            subExcludes = subExcludes + self.gofilter.SubExcludeParts
+        return GoFilter.Descend(subExcludes, os.path.basename(path))
+
+    @staticmethod
+    def GetStamp(path: str) -> typing.Optional[typing.Tuple[int, int, int]]:
+        try:
+            s = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISDIR(s.st_mode):
+            return None
+        return (s.st_dev, s.st_ino, s.st_mtime_ns)
+
+    @staticmethod
+    def GetFilterStamp(path: str, name: str) -> typing.Optional[typing.Tuple[str, int, int]]:
+        try:
+            s = os.stat(os.path.join(path, name))
+        except OSError:
+            return None
+        return (name, s.st_mtime_ns, s.st_size)
+
+    def IsUpToDate(self) -> bool:
+        # a changed gofilter doesn't touch the directory's mtime, so it has to be checked separately
+        if DirectoryCacheItem.GetStamp(self.path) != self.stamp:
+            return False
+        if self.filterStamp is not None:
+            if DirectoryCacheItem.GetFilterStamp(self.path, self.filterStamp[0]) != self.filterStamp:
+                return False
+        return True
+
+class VectorizedScorer():
+    # every indexed name as code points in one flat array, sorted by length so that the names of one length are
+    # a (count, length) matrix; the LCS of the pattern and a name bounds difflib's ratio from above
+    # (2 * matches / total length), and is computed for a whole matrix at once, bit-parallel over the name's
+    # characters, so that only the names able to pass the threshold are scored
+    _MaxWidth = 64
+    _ChunkSize = 65536
+
+    @staticmethod
+    def IsAvailable() -> bool:
+        global numpy, NUMPY_AVAILABLE
+        if NUMPY_AVAILABLE and numpy is None:
+            try:
+                import numpy
+            except:
+                NUMPY_AVAILABLE = False
+        return NUMPY_AVAILABLE
+
+    def __init__(self, names: typing.List[str]):
+        lengths = numpy.fromiter((len(x) for x in names), dtype=numpy.int64, count=len(names))
+        self.order = numpy.argsort(lengths, kind="stable")
+        sortedLengths = lengths[self.order]
+        self.starts = numpy.searchsorted(sortedLengths, numpy.arange(int(sortedLengths[-1]) + 2 if len(names) else 1))
+        self.offsets = numpy.zeros(len(names) + 1, dtype=numpy.int64)
+        numpy.cumsum(sortedLengths, out=self.offsets[1:])
+        self.codes = numpy.frombuffer("".join([names[i] for i in self.order.tolist()]).encode("utf-32-le", "surrogatepass"),
+                                      dtype=numpy.uint32)
+        # latin-1 characters (nearly all of them) are compared a byte at a time
+        self.narrowCodes = numpy.minimum(self.codes, 0xFF).astype(numpy.uint8)
+
+    def GetCandidates(self, pattern: str) -> typing.List[int]:
+        # indices of the names whose ratio can reach the threshold; names too long for a machine word are
+        # left to difflib
+        m = len(pattern)
+        candidates = []
+        for length in range(1, len(self.starts) - 1):
+            # same as real_quick_ratio
+            if 2.0 * min(length, m) / (length + m) < FUZZY_MATCH_THRESHOLD:
+                continue
+            (start, end) = (int(self.starts[length]), int(self.starts[length + 1]))
+            if start == end:
+                continue
+            if length > VectorizedScorer._MaxWidth:
+                candidates.append(self.order[start:end])
+                continue
+
+            names = self.codes[self.offsets[start]:self.offsets[end]].reshape(end - start, length)
+            narrowNames = self.narrowCodes[self.offsets[start]:self.offsets[end]].reshape(end - start, length)
+            for chunkStart in range(0, end - start, VectorizedScorer._ChunkSize):
+                chunk = slice(chunkStart, chunkStart + VectorizedScorer._ChunkSize)
+                lcs = VectorizedScorer._GetLcsLengths(pattern, names[chunk], narrowNames[chunk])
+                passing = numpy.flatnonzero(2.0 * lcs / (length + m) >= FUZZY_MATCH_THRESHOLD)
+                candidates.append(self.order[start + chunkStart + passing])
+
+        if len(candidates) == 0:
+            return []
+        return sorted(numpy.concatenate(candidates).tolist())
+
+    @staticmethod
+    def _GetLcsLengths(pattern: str, names: "numpy.ndarray", narrowNames: "numpy.ndarray") -> "numpy.ndarray":
+        (count, length) = names.shape
+
+        # Hyyrö's bit-vector LCS: a zero bit in v for every matched character of the name
+        # (rows are padded to whole bytes, since packing a flat array is much faster than packing along an axis)
+        byteWidth = (length + 7) // 8
+        matches = numpy.zeros((count, 8 * byteWidth), dtype=bool)
+        matchMasks: typing.Dict[str, "numpy.ndarray"] = {}
+        v = numpy.full(count, numpy.uint64(0xFFFFFFFFFFFFFFFF))
+        for c in pattern:
+            match = matchMasks.get(c)
+            if match is None:
+                if ord(c) < 0xFF:
+                    numpy.equal(narrowNames, ord(c), out=matches[:, :length])
+                else:
+                    numpy.equal(names, ord(c), out=matches[:, :length])
+                bits = numpy.zeros((count, 8), dtype=numpy.uint8)
+                bits[:, :byteWidth] = numpy.packbits(matches.ravel(), bitorder="little").reshape(count, byteWidth)
+                match = matchMasks[c] = bits.view("<u8").ravel()
+            u = v & match
+            v = (v + u) | (v & ~match)
+
+        lengthMask = numpy.uint64((1 << length) - 1)
+        return length - VectorizedScorer._PopCount(v & lengthMask)
+
+    @staticmethod
+    def _PopCount(values: "numpy.ndarray") -> "numpy.ndarray":
+        if hasattr(numpy, "bitwise_count"):
+            return numpy.bitwise_count(values).astype(numpy.int64)
+        return numpy.unpackbits(values.view(numpy.uint8)).reshape(len(values), 64).sum(axis=1, dtype=numpy.int64)
+
+class MatchCacheBase():
+    # building the scorer costs seconds for large indexes, so it only pays off for caches kept across lookups,
+    # ie. by the resident server; a single run is faster with the trigram index
+    vectorized = False
+
+    def GetFuzzyMatches(self, matcher: "TargetMatcher") -> typing.List[typing.Tuple[MatchCacheItem, float]]:
+        # scores names (and stems) instead of entries; when vectorized, every name that can reach the threshold is
+        # scored, otherwise only those that share enough trigrams with the pattern;
+        # returns the entries scoring above the threshold, in path order
+        if self.vectorized and VectorizedScorer.IsAvailable():
+            if self._Scorer is None:
+                self._Scorer = VectorizedScorer(self._GetAllNames())
+            names = [self._GetNameKey(i) for i in self._Scorer.GetCandidates(matcher.Pattern)]
+        else:
+            trigrams = Utils.GetTrigrams(matcher.Pattern)
+            threshold = max(1, int(FUZZY_TRIGRAM_SHARE * len(trigrams)))
+            names = [name for (name, count) in self._CountTrigramNames(trigrams).items() if count >= threshold]
+
+        scores: typing.Dict[int, float] = {}
+        for name in names:
+            ratio = matcher.Ratio(self._GetName(name))
+            if ratio < FUZZY_MATCH_THRESHOLD:
+                continue
+            for i in self._GetNamePositions(name):
+                scores[i] = max(scores.get(i, 0), ratio)
+
+        return [(self._GetPath(i), scores[i]) for i in sorted(scores)]
 
-class MatchCache():
-    def __init__(self, timestamp: float, paths: typing.List[MatchCacheItem]):
-        self.version = CURRENT_VERSION
+    def _CountTrigramNames(self, trigrams: typing.Set[str]) -> typing.Counter:
+        raise NotImplementedError()
+
+    def GetNamesWithPrefix(self, prefix: str) -> typing.List[str]:
+        # names are sorted, so the ones starting with prefix are a contiguous range
+        prefix = Utils.NormalizeName(prefix)
+        key = lambda i: self._GetName(self._GetNameKey(i))[:len(prefix)]
+        names = range(self._GetNameCount())
+        start = bisect.bisect_left(names, prefix, key=key)
+        end = bisect.bisect_right(names, prefix, lo=start, key=key)
+        return self._GetNameRange(start, end)
+
+    def _GetAllNames(self) -> typing.List[str]:
+        raise NotImplementedError()
+
+    def _GetNameRange(self, start: int, end: int) -> typing.List[str]:
+        raise NotImplementedError()
+
+    def _GetNameCount(self) -> int:
+        raise NotImplementedError()
+
+    def _GetNameKey(self, i: int):
+        raise NotImplementedError()
+
+    def _GetName(self, name) -> str:
+        raise NotImplementedError()
+
+    def _GetNamePositions(self, name) -> typing.Iterable[int]:
+        raise NotImplementedError()
+
+    def _GetPath(self, i: int) -> MatchCacheItem:
+        raise NotImplementedError()
+
+class MatchCache(MatchCacheBase):
+    def __init__(self, timestamp: float, paths: typing.List[MatchCacheItem],
+                 directories: typing.Optional[typing.Dict[typing.Tuple[str, bool], DirectoryCacheItem]] = None):
         self.timestamp = timestamp
         self.paths = paths
+        self.directories = directories if directories is not None else {}
+        self.nameIndex: typing.Optional[typing.Dict[str, typing.List[int]]] = None
+        self.trigramIndex: typing.Optional[typing.Dict[str, typing.List[str]]] = None
+        self._Names: typing.Optional[typing.List[str]] = None
+        self._Scorer: typing.Optional[VectorizedScorer] = None
+
+    def GetNameIndex(self) -> typing.Dict[str, typing.List[int]]:
+        # normalized file name and stem -> indices into paths, in path order
+        if self.nameIndex is None:
+            index = {}
+            for (i, item) in enumerate(self.paths):
+                filename = Utils.NormalizeName(item.filename)
+                (stem, _) = os.path.splitext(filename)
+                index.setdefault(filename, []).append(i)
+                if stem != filename:
+                    index.setdefault(stem, []).append(i)
+            self.nameIndex = index
+        return self.nameIndex
+
+    def GetTrigramIndex(self) -> typing.Dict[str, typing.List[str]]:
+        # trigram -> names of the name index containing it
+        if self.trigramIndex is None:
+            index = {}
+            for name in self.GetNameIndex():
+                for trigram in Utils.GetTrigrams(name):
+                    index.setdefault(trigram, []).append(name)
+            self.trigramIndex = index
+        return self.trigramIndex
+
+    def Lookup(self, name: str) -> typing.List[MatchCacheItem]:
+        indices = self.GetNameIndex().get(Utils.NormalizeName(name), [])
+        return [self.paths[i] for i in indices]
+
+    def _CountTrigramNames(self, trigrams: typing.Set[str]) -> typing.Counter:
+        trigramIndex = self.GetTrigramIndex()
+        counts = collections.Counter()
+        for trigram in trigrams:
+            counts.update(trigramIndex.get(trigram, ()))
+        return counts
+
+    def _GetAllNames(self) -> typing.List[str]:
+        # sorted, like the names of a cache file
+        if self._Names is None:
+            self._Names = sorted(self.GetNameIndex())
+        return self._Names
+
+    def _GetNameRange(self, start: int, end: int) -> typing.List[str]:
+        return self._GetAllNames()[start:end]
+
+    def _GetNameCount(self) -> int:
+        return len(self._GetAllNames())
+
+    def _GetNameKey(self, i: int) -> str:
+        return self._GetAllNames()[i]
+
+    def _GetName(self, name: str) -> str:
+        return name
+
+    def _GetNamePositions(self, name: str) -> typing.Iterable[int]:
+        return self.GetNameIndex()[name]
+
+    def _GetPath(self, i: int) -> MatchCacheItem:
+        return self.paths[i]
+
+    def Close(self):
+        pass
+
+class MatchCacheFile(MatchCacheBase):
+    # read-only, mmap'ed view of a cache written by MatchCacheFile.Write; nothing is decoded up front,
+    # so exact lookups only touch the few records they need
+    # layout (little endian): header (magic, format version, flags, timestamp, section count),
+    # a (tag, offset, length) section table, and then the sections:
+    #   STRS  sorted string table: count, count+1 offsets, utf-8 blob
+    #   ITEM  every item: (path, filename, link target) string ids, flags, and the file id
+    #   PATH  the final (deduplicated) entries, as item indices
+    #   NAME  sorted normalized names and stems: (string id, posting start, posting count)
+    #   POST  PATH indices for every NAME
+    #   HASH  open addressing table of NAME indices + 1, keyed by the crc32 of the name
+    #   TRGM  (crc32, posting start, posting count) of every trigram of every NAME, sorted by crc32
+    #   TPST  NAME indices for every TRGM
+    #   DIRS  directory records, used to revalidate the cache; gofilter lines and inherited sub-path excludes
+    #         (components joined by "/") are kept too, so unchanged gofilters aren't read again
+    #   LIST  u32 lists referenced by DIRS
+
+    MAGIC = b"GOCACHE\0"
+    FORMAT_VERSION = 4
+
+    _Header = struct.Struct("<8sIIdI")
+    _Section = struct.Struct("<4sQQ")
+    _U32 = struct.Struct("<I")
+    _ItemRecord = struct.Struct("<IIIIQQ")
+    _NameRecord = struct.Struct("<III")
+    _TrigramRecord = struct.Struct("<III")
+    _DirectoryRecord = struct.Struct("<IIQQqqqIIIIIIIIIII")
+    _NONE = 0xFFFFFFFF
+
+    _FLAG_FILE_ID = 1
+
+    _FLAG_RECURSIVE = 1
+    _FLAG_MISSING = 2
+    _FLAG_FILTER = 4
+    _FLAG_FILTER_LINES = 8
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._Map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            (magic, version, _, self.timestamp, sectionCount) = MatchCacheFile._Header.unpack_from(self._Map, 0)
+            if magic != MatchCacheFile.MAGIC or version != MatchCacheFile.FORMAT_VERSION:
+                raise ValueError("unknown cache format")
+
+            self._Sections: typing.Dict[bytes, int] = {}
+            offset = MatchCacheFile._Header.size
+            for _ in range(sectionCount):
+                (tag, sectionOffset, sectionLength) = MatchCacheFile._Section.unpack_from(self._Map, offset)
+                if sectionOffset + sectionLength > len(self._Map):
+                    raise ValueError("truncated cache")
+                self._Sections[tag] = sectionOffset
+                offset += MatchCacheFile._Section.size
+
+            self._StringCount = self._ReadU32(self._Sections[b"STRS"])
+            self._StringOffsets = self._Sections[b"STRS"] + 4
+            self._StringBlob = self._StringOffsets + 4 * (self._StringCount + 1)
+        except Exception:
+            self.Close()
+            raise
+
+        self._Items: typing.Dict[int, MatchCacheItem] = {}
+        self._Paths: typing.Optional[typing.List[MatchCacheItem]] = None
+        self._Directories = None
+        self._Scorer: typing.Optional[VectorizedScorer] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _, __, ___):
+        self.Close()
+
+    def Close(self):
+        if self._Map is not None:
+            self._Map.close()
+            self._Map = None
+
+    def _ReadU32(self, offset: int) -> int:
+        return MatchCacheFile._U32.unpack_from(self._Map, offset)[0]
+
+    def _Count(self, tag: bytes) -> int:
+        return self._ReadU32(self._Sections[tag])
+
+    def _ListValue(self, tag: bytes, i: int) -> int:
+        return self._ReadU32(self._Sections[tag] + 4 + 4 * i)
+
+    def _ListRange(self, tag: bytes, start: int, count: int) -> typing.Tuple[int, ...]:
+        return struct.unpack_from("<%dI" % count, self._Map, self._Sections[tag] + 4 + 4 * start)
+
+    def _StringBytes(self, i: int) -> bytes:
+        (start, end) = struct.unpack_from("<II", self._Map, self._StringOffsets + 4 * i)
+        return self._Map[self._StringBlob + start:self._StringBlob + end]
+
+    def _String(self, i: int) -> typing.Optional[str]:
+        if i == MatchCacheFile._NONE:
+            return None
+        return self._StringBytes(i).decode("utf-8", "surrogateescape")
+
+    def _GetItem(self, i: int) -> MatchCacheItem:
+        item = self._Items.get(i)
+        if item is None:
+            offset = self._Sections[b"ITEM"] + 4 + MatchCacheFile._ItemRecord.size * i
+            (pathId, filenameId, linkId, flags, dev, ino) = MatchCacheFile._ItemRecord.unpack_from(self._Map, offset)
+            item = MatchCacheItem(self._String(pathId), self._String(filenameId))
+            item.linkTarget = self._String(linkId)
+            if flags & MatchCacheFile._FLAG_FILE_ID:
+                item.fileId = (dev, ino)
+            self._Items[i] = item
+        return item
+
+    @property
+    def paths(self) -> typing.List[MatchCacheItem]:
+        if self._Paths is None:
+            self._Paths = [self._GetItem(self._ListValue(b"PATH", i)) for i in range(self._Count(b"PATH"))]
+        return self._Paths
+
+    @property
+    def directories(self) -> typing.Dict[typing.Tuple[str, bool], DirectoryCacheItem]:
+        if self._Directories is None:
+            directories = {}
+            offset = self._Sections[b"DIRS"] + 4
+            for _ in range(self._Count(b"DIRS")):
+                (pathId, flags, dev, ino, mtime, filterMtime, filterSize, filterNameId,
+                 itemsStart, itemsCount, dirsStart, dirsCount, includesStart, includesCount,
+                 linesStart, linesCount, excludesStart, excludesCount) = \
+                    MatchCacheFile._DirectoryRecord.unpack_from(self._Map, offset)
+                offset += MatchCacheFile._DirectoryRecord.size
+
+                directory = DirectoryCacheItem(self._String(pathId), bool(flags & MatchCacheFile._FLAG_RECURSIVE))
+                if not flags & MatchCacheFile._FLAG_MISSING:
+                    directory.stamp = (dev, ino, mtime)
+                if flags & MatchCacheFile._FLAG_FILTER:
+                    directory.filterStamp = (self._String(filterNameId), filterMtime, filterSize)
+                directory.files = [self._GetItem(self._ListValue(b"LIST", i)) for i in range(itemsStart, itemsStart + itemsCount)]
+                directory.directories = [self._String(self._ListValue(b"LIST", i)) for i in range(dirsStart, dirsStart + dirsCount)]
+                directory.subIncludes = [self._String(self._ListValue(b"LIST", i)) for i in range(includesStart, includesStart + includesCount)]
+                if flags & MatchCacheFile._FLAG_FILTER_LINES:
+                    lines = [self._String(self._ListValue(b"LIST", i)) for i in range(linesStart, linesStart + linesCount)]
+                    directory.gofilter = GoFilter(os.path.join(directory.path, directory.filterStamp[0]), lines)
+                directory.inheritedExcludes = tuple(tuple(self._String(self._ListValue(b"LIST", i)).split("/"))
+                                                    for i in range(excludesStart, excludesStart + excludesCount))
+                directories[(directory.path, directory.recursive)] = directory
+            self._Directories = directories
+        return self._Directories
+
+    def Lookup(self, name: str) -> typing.List[MatchCacheItem]:
+        key = Utils.NormalizeName(name).encode("utf-8", "surrogateescape")
+        hashOffset = self._Sections[b"HASH"]
+        bucketCount = self._ReadU32(hashOffset)
+        mask = bucketCount - 1
+
+        bucket = zlib.crc32(key) & mask
+        for _ in range(bucketCount):
+            slot = self._ReadU32(hashOffset + 4 + 4 * bucket)
+            if slot == 0:
+                break
+
+            offset = self._Sections[b"NAME"] + 4 + MatchCacheFile._NameRecord.size * (slot - 1)
+            (keyId, postingStart, postingCount) = MatchCacheFile._NameRecord.unpack_from(self._Map, offset)
+            if self._StringBytes(keyId) == key:
+                return [self._GetItem(self._ListValue(b"PATH", self._ListValue(b"POST", i)))
+                        for i in range(postingStart, postingStart + postingCount)]
+
+            bucket = (bucket + 1) & mask
+        return []
+
+    def _FindTrigram(self, trigramHash: int) -> typing.Optional[typing.Tuple[int, int]]:
+        offset = self._Sections[b"TRGM"] + 4
+        (low, high) = (0, self._Count(b"TRGM"))
+        while low < high:
+            middle = (low + high) // 2
+            (h, postingStart, postingCount) = MatchCacheFile._TrigramRecord.unpack_from(
+                self._Map, offset + MatchCacheFile._TrigramRecord.size * middle)
+            if h < trigramHash:
+                low = middle + 1
+            elif h > trigramHash:
+                high = middle
+            else:
+                return (postingStart, postingCount)
+        return None
+
+    def _CountTrigramNames(self, trigrams: typing.Set[str]) -> typing.Counter:
+        # crc32 collisions only add a few more names to score
+        counts = collections.Counter()
+        for trigram in trigrams:
+            found = self._FindTrigram(zlib.crc32(trigram.encode("utf-8", "surrogateescape")))
+            if found is not None:
+                counts.update(self._ListRange(b"TPST", *found))
+        return counts
+
+    def _GetAllNames(self) -> typing.List[str]:
+        return self._GetNameRange(0, self._Count(b"NAME"))
+
+    def _GetNameRange(self, start: int, end: int) -> typing.List[str]:
+        offset = self._Sections[b"NAME"] + 4 + MatchCacheFile._NameRecord.size * start
+        records = struct.unpack_from("<%dI" % (3 * (end - start)), self._Map, offset)
+        return [self._String(i) for i in records[::3]]
+
+    def _GetNameCount(self) -> int:
+        return self._Count(b"NAME")
+
+    def _GetNameKey(self, i: int) -> int:
+        return i
+
+    def _GetName(self, name: int) -> str:
+        offset = self._Sections[b"NAME"] + 4 + MatchCacheFile._NameRecord.size * name
+        return self._String(MatchCacheFile._NameRecord.unpack_from(self._Map, offset)[0])
+
+    def _GetNamePositions(self, name: int) -> typing.Iterable[int]:
+        offset = self._Sections[b"NAME"] + 4 + MatchCacheFile._NameRecord.size * name
+        (_, postingStart, postingCount) = MatchCacheFile._NameRecord.unpack_from(self._Map, offset)
+        return self._ListRange(b"POST", postingStart, postingCount)
+
+    def _GetPath(self, i: int) -> MatchCacheItem:
+        return self._GetItem(self._ListValue(b"PATH", i))
+
+    @staticmethod
+    def Write(path: str, matchCache: MatchCache):
+        nameIndex = matchCache.GetNameIndex()
+        directories = list(matchCache.directories.values())
+
+        # every item gets an index, whether it's part of the final list, a directory, or both
+        itemIds: typing.Dict[int, int] = {}
+        items: typing.List[MatchCacheItem] = []
+        def itemId(item: MatchCacheItem) -> int:
+            i = itemIds.get(id(item))
+            if i is None:
+                i = itemIds[id(item)] = len(items)
+                items.append(item)
+            return i
+
+        pathList = [itemId(x) for x in matchCache.paths]
+        for directory in directories:
+            for item in directory.files:
+                itemId(item)
+
+        strings = set(nameIndex.keys())
+        for item in items:
+            strings.add(item.path)
+            strings.add(item.filename)
+            if item.linkTarget is not None:
+                strings.add(item.linkTarget)
+        for directory in directories:
+            strings.add(directory.path)
+            strings.update(directory.directories)
+            strings.update(directory.subIncludes)
+            if directory.filterStamp is not None:
+                strings.add(directory.filterStamp[0])
+            if directory.gofilter is not None:
+                strings.update(directory.gofilter.Lines)
+            strings.update("/".join(x) for x in directory.inheritedExcludes)
+        strings = sorted(strings)
+        stringIds = {x: i for (i, x) in enumerate(strings)}
+
+        def u32List(values: typing.List[int]) -> bytes:
+            return struct.pack("<I%dI" % len(values), len(values), *values)
+
+        encodedStrings = [x.encode("utf-8", "surrogateescape") for x in strings]
+        stringOffsets = list(itertools.accumulate((len(x) for x in encodedStrings), initial=0))
+        stringsSection = struct.pack("<I%dI" % len(stringOffsets), len(strings), *stringOffsets) + b"".join(encodedStrings)
+
+        itemsSection = bytearray(MatchCacheFile._U32.pack(len(items)))
+        for item in items:
+            linkId = MatchCacheFile._NONE if item.linkTarget is None else stringIds[item.linkTarget]
+            (flags, dev, ino) = (0, 0, 0) if item.fileId is None else (MatchCacheFile._FLAG_FILE_ID, *item.fileId)
+            itemsSection += MatchCacheFile._ItemRecord.pack(stringIds[item.path], stringIds[item.filename], linkId,
+                                                            flags, dev, ino)
+
+        names = sorted(nameIndex.keys())
+        namesSection = bytearray(MatchCacheFile._U32.pack(len(names)))
+        postings = []
+        for name in names:
+            namesSection += MatchCacheFile._NameRecord.pack(stringIds[name], len(postings), len(nameIndex[name]))
+            postings.extend(nameIndex[name])
+
+        bucketCount = 1
+        while bucketCount < len(names) * 2:
+            bucketCount *= 2
+        buckets = [0] * bucketCount
+        for (i, name) in enumerate(names):
+            bucket = zlib.crc32(name.encode("utf-8", "surrogateescape")) & (bucketCount - 1)
+            while buckets[bucket] != 0:
+                bucket = (bucket + 1) & (bucketCount - 1)
+            buckets[bucket] = i + 1
+
+        trigramPostings: typing.Dict[int, typing.Set[int]] = {}
+        for (i, name) in enumerate(names):
+            for trigram in Utils.GetTrigrams(name):
+                trigramPostings.setdefault(zlib.crc32(trigram.encode("utf-8", "surrogateescape")), set()).add(i)
+        trigramsSection = bytearray(MatchCacheFile._U32.pack(len(trigramPostings)))
+        trigramNames = []
+        for trigramHash in sorted(trigramPostings):
+            postingNames = sorted(trigramPostings[trigramHash])
+            trigramsSection += MatchCacheFile._TrigramRecord.pack(trigramHash, len(trigramNames), len(postingNames))
+            trigramNames.extend(postingNames)
+
+        lists = []
+        def appendList(values: typing.List[int]) -> typing.Tuple[int, int]:
+            start = len(lists)
+            lists.extend(values)
+            return (start, len(values))
+
+        directoriesSection = bytearray(MatchCacheFile._U32.pack(len(directories)))
+        for directory in directories:
+            flags = 0
+            if directory.recursive:
+                flags |= MatchCacheFile._FLAG_RECURSIVE
+            (dev, ino, mtime) = (0, 0, 0)
+            if directory.Missing:
+                flags |= MatchCacheFile._FLAG_MISSING
+            else:
+                (dev, ino, mtime) = directory.stamp
+            (filterNameId, filterMtime, filterSize) = (MatchCacheFile._NONE, 0, 0)
+            if directory.filterStamp is not None:
+                flags |= MatchCacheFile._FLAG_FILTER
+                filterNameId = stringIds[directory.filterStamp[0]]
+                (_, filterMtime, filterSize) = directory.filterStamp
+
+            itemsRange = appendList([itemIds[id(x)] for x in directory.files])
+            dirsRange = appendList([stringIds[x] for x in directory.directories])
+            includesRange = appendList([stringIds[x] for x in directory.subIncludes])
+            linesRange = (0, 0)
+            if directory.filterStamp is not None and directory.gofilter is not None:
+                flags |= MatchCacheFile._FLAG_FILTER_LINES
+                linesRange = appendList([stringIds[x] for x in directory.gofilter.Lines])
+            excludesRange = appendList([stringIds["/".join(x)] for x in directory.inheritedExcludes])
+            directoriesSection += MatchCacheFile._DirectoryRecord.pack(
+                stringIds[directory.path], flags, dev, ino, mtime, filterMtime, filterSize, filterNameId,
+                *itemsRange, *dirsRange, *includesRange, *linesRange, *excludesRange)
+
+        sections = [
+            (b"STRS", stringsSection),
+            (b"ITEM", bytes(itemsSection)),
+            (b"PATH", u32List(pathList)),
+            (b"NAME", bytes(namesSection)),
+            (b"POST", u32List(postings)),
+            (b"HASH", u32List(buckets)),
+            (b"TRGM", bytes(trigramsSection)),
+            (b"TPST", u32List(trigramNames)),
+            (b"DIRS", bytes(directoriesSection)),
+            (b"LIST", u32List(lists)),
+        ]
+
+        offset = MatchCacheFile._Header.size + MatchCacheFile._Section.size * len(sections)
+        table = []
+        for (tag, data) in sections:
+            table.append(MatchCacheFile._Section.pack(tag, offset, len(data)))
+            offset += len(data)
+
+        # readers only ever see a complete file, the old one or the new one
+        temporaryPath = "%s.%d.tmp" % (path, os.getpid())
+        try:
+            with open(temporaryPath, "wb") as f:
+                f.write(MatchCacheFile._Header.pack(MatchCacheFile.MAGIC, MatchCacheFile.FORMAT_VERSION, 0,
+                                                    matchCache.timestamp, len(sections)))
+                f.writelines(table)
+                f.writelines(data for (_, data) in sections)
+            os.replace(temporaryPath, path)
+        except OSError:
+            try:
+                os.remove(temporaryPath)
+            except OSError:
+                pass
+            raise
+
+class TargetMatcher():
+    # the target is compiled once for its match mode; nothing is shared between instances,
+    # so each request or thread can use its own
+    MAX_SUGGESTIONS = 5
+
+    def __init__(self, target: str, fuzzy: bool, asRegex: bool, asWildcard: bool,
+                 directoryFilter: typing.Optional[typing.List[typing.Tuple[bool, str]]] = None):
+        self.Target = target
+        self.Fuzzy = fuzzy
+        self.Pattern = Utils.NormalizeName(target)
+
+        self._Regex: typing.Optional[typing.Pattern] = None
+        if fuzzy and asRegex:
+            self._Regex = re.compile(target, re.I)
+        elif fuzzy and asWildcard:
+            self._Regex = re.compile(fnmatch.translate(self.Pattern))
+
+        self._DirectoryFilter = [(include, x.lower()) for (include, x) in (directoryFilter or [])]
+
+        self._SequenceMatcher = difflib.SequenceMatcher()
+        self._SequenceMatcher.set_seq2(self.Pattern)
+
+    @staticmethod
+    def FromConfig(config: "GoConfig", target: str) -> "TargetMatcher":
+        return TargetMatcher(target, config.FuzzyMatch, config.RegexTargetMatch, config.WildcardTargetMatch,
+                             config.DirectoryFilter)
+
+    def PassesDirectoryFilter(self, path: str) -> bool:
+        (directory, _) = os.path.split(path)
+        directory = directory.lower()
+
+        for (include, directoryFilter) in self._DirectoryFilter:
+            if (include and directoryFilter not in directory) or (not include and directoryFilter in directory):
+                return False
+        return True
+
+    def Ratio(self, text: str) -> float:
+        # anything below the threshold is reported as 0; the cheap upper bounds weed most of it out
+        sm = self._SequenceMatcher
+        sm.set_seq1(text)
+        if sm.real_quick_ratio() < FUZZY_MATCH_THRESHOLD or sm.quick_ratio() < FUZZY_MATCH_THRESHOLD:
+            return 0
+        return sm.ratio()
+
+    def Score(self, file: str) -> float:
+        file = Utils.NormalizeName(file)
+        (filename, _) = os.path.splitext(file)
+
+        if not self.Fuzzy:
+            return int(filename == self.Pattern or file == self.Pattern)
+        if self._Regex is not None:
+            return int(bool(self._Regex.match(filename) or self._Regex.match(file)))
+        return max(self.Ratio(filename), self.Ratio(file))
+
+    @property
+    def Suggests(self) -> bool:
+        # whether there can be anything besides exact matches
+        return self.Fuzzy and self._Regex is None
+
+    def FindSimilarItems(self, matchCache: "MatchCacheBase", applyDirectoryFilter: bool = True, exactOnly: bool = False) \
+            -> typing.List[typing.Tuple["MatchCacheItem", float]]:
+        # every entry that is an exact or fuzzy match, in path order
+        if not self.Fuzzy or (exactOnly and self._Regex is None):
+            # exact names only; a single probe of the name index
+            similarItems = [(x, 1.0) for x in matchCache.Lookup(self.Target)]
+        elif self._Regex is None:
+            similarItems = matchCache.GetFuzzyMatches(self)
+        else:
+            # patterns can't use the name indexes, so every entry is tried; filtered ones are skipped up front
+            similarItems = []
+            for item in matchCache.paths:
+                if applyDirectoryFilter and not self.PassesDirectoryFilter(item.path):
+                    continue
+                score = self.Score(item.filename)
+                if score > 0:
+                    similarItems.append((item, score))
+            return similarItems
+
+        if applyDirectoryFilter:
+            similarItems = [x for x in similarItems if self.PassesDirectoryFilter(x[0].path)]
+        return similarItems
+
+    def Rank(self, similarItems: typing.Iterable[typing.Tuple["MatchCacheItem", float]]) \
+            -> typing.Tuple[typing.List[str], typing.List[str]]:
+        # one pass; the suggestions are the best few by ratio, earlier entries first on ties
+        exactMatches = []
+        best = []
+        for (i, (item, ratio)) in enumerate(similarItems):
+            if ratio == 1:
+                exactMatches.append(item.path)
+            elif ratio >= FUZZY_MATCH_THRESHOLD:
+                entry = (ratio, -i, item.path)
+                if len(best) < TargetMatcher.MAX_SUGGESTIONS:
+                    heapq.heappush(best, entry)
+                else:
+                    heapq.heappushpop(best, entry)
+
+        return (exactMatches, [x[2] for x in sorted(best, reverse=True)])
+
+
+class FileLock():
+    # advisory lock held on a separate file, between processes; the OS releases it if the holder dies
+    _PollInterval = 0.05
+
+    def __init__(self, path: str):
+        self.path = path
+        self._File = None
+
+    def __enter__(self):
+        self.Acquire()
+        return self
+
+    def __exit__(self, _, __, ___):
+        self.Release()
+
+    def Acquire(self, timeout: typing.Optional[float] = None) -> bool:
+        # waits up to timeout seconds (forever if None); a 0 timeout only tries once
+        f = open(self.path, "a+b")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                if Utils.IsWindows():
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._File = f
+                return True
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    f.close()
+                    return False
+            time.sleep(FileLock._PollInterval)
+
+    def Release(self):
+        if self._File is None:
+            return
+        try:
+            if Utils.IsWindows():
+                self._File.seek(0)
+                msvcrt.locking(self._File.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._File.fileno(), fcntl.LOCK_UN)
+        except OSError:
+            pass
+        self._File.close()
+        self._File = None
+
+class ResolutionMemo():
+    # remembers the last resolved path for a target, working directory and configuration;
+    # a hit is trusted as long as the file still exists and its directory didn't change
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        self.entries: typing.Dict[str, list] = {}
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            if isinstance(entries, dict):
+                self.entries = entries
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def GetKey(config: "GoConfig", target: str, lazy: bool) -> str:
+        settings = [
+            target,
+            os.getcwd(),
+            config.GetCacheFingerprint(),
+            config.FuzzyMatch,
+            config.RegexTargetMatch,
+            config.WildcardTargetMatch,
+            config.DirectoryFilter,
+            config.NthMatch,
+            config.FirstMatchFromConfig,
+            lazy or config.LazyResolution
+        ]
+        return hashlib.sha1(json.dumps(settings).encode("utf-8", "surrogateescape")).hexdigest()
+
+    @staticmethod
+    def _GetParentStamp(path: str) -> typing.Optional[int]:
+        try:
+            return os.stat(os.path.dirname(path)).st_mtime_ns
+        except OSError:
+            return None
+
+    def Get(self, key: str) -> typing.Optional[str]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        (path, parentStamp) = entry
+        if not os.path.isfile(path) or ResolutionMemo._GetParentStamp(path) != parentStamp:
+            del self.entries[key]
+            self._Save()
+            return None
+
+        # hits don't reorder the entries, so that they never write the file; the oldest resolution is evicted first
+        return path
+
+    def Put(self, key: str, path: str):
+        parentStamp = ResolutionMemo._GetParentStamp(path)
+        if parentStamp is None:
+            return
+
+        self.entries.pop(key, None)
+        self.entries[key] = [path, parentStamp]
+        while len(self.entries) > self.size:
+            del self.entries[next(iter(self.entries))]
+        self._Save()
+
+    def _Save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temporaryPath = "%s.%d.tmp" % (self.path, os.getpid())
+            with open(temporaryPath, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(temporaryPath, self.path)
+        except OSError:
+            Cprint(">>>failed to save the resolution memo", level=1)
 
-    def GoodVersion(self) -> bool:
-        return self.version == CURRENT_VERSION
 
 class ApplyListSpecifier():
     __ApplyRegex = re.compile(r"^(?:([cdfghipru]|py)apply|(-?\d+))(.+)?$", re.I)
@@ -624,21 +1540,42 @@ class ExternalModule():
 
 
 class GoFilter():
-    def __init__(self, path: str):
+    SubExcludesType = typing.Tuple[typing.Tuple[str, ...], ...]
+
+    def __init__(self, path: str, lines: typing.Optional[typing.List[str]] = None):
         self.Path = path
+        self.Lines = lines
 
         self.Includes: typing.List[str] = []
         self.Excludes: typing.List[str] = []
         self.SubIncludes: typing.List[str] = []
-        self.SubExcludes: typing.List[str] = [] # todo
+        self.SubExcludes: typing.List[str] = []
 
         self.__Read()
 
+        # every include/exclude set is matched with a single regex
+        self._IncludeRegex = GoFilter._Compile(tuple(self.Includes))
+        self._ExcludeRegex = GoFilter._Compile(tuple(self.Excludes))
+        self.SubExcludeParts: GoFilter.SubExcludesType = tuple(GoFilter._SplitPath(x) for x in self.SubExcludes)
+
+    __Cache: typing.Dict[str, typing.Tuple[typing.Tuple[str, int, int], "GoFilter"]] = {}
+    @staticmethod
+    def Load(path: str, filterStamp: typing.Tuple[str, int, int]) -> "GoFilter":
+        # parsed once per path and stamp
+        cached = GoFilter.__Cache.get(path)
+        if cached is not None and cached[0] == filterStamp:
+            return cached[1]
+
+        gofilter = GoFilter(path)
+        GoFilter.__Cache[path] = (filterStamp, gofilter)
+        return gofilter
+
     def __Read(self):
-        with open(self.Path, "r") as f:
-            gofilterFilters = f.read().splitlines()
+        if self.Lines is None:
+            with open(self.Path, "r") as f:
+                self.Lines = f.read().splitlines()
 
-        for line in gofilterFilters:
+        for line in self.Lines:
             hasSubdir = "/" in line or "\\" in line
 
             if line.startswith("+"):
@@ -655,14 +1592,393 @@ class GoFilter():
                 else:
                     self.Excludes.append(text)
 
+    __CompiledPatterns: typing.Dict[typing.Tuple[str, ...], typing.Optional[typing.Pattern]] = {}
+    @staticmethod
+    def _Compile(patterns: typing.Tuple[str, ...]) -> typing.Optional[typing.Pattern]:
+        if not patterns:
+            return None
+
+        compiled = GoFilter.__CompiledPatterns.get(patterns)
+        if compiled is None:
+            compiled = re.compile("|".join(fnmatch.translate(os.path.normcase(x)) for x in patterns))
+            GoFilter.__CompiledPatterns[patterns] = compiled
+        return compiled
+
+    @staticmethod
+    def _SplitPath(path: str) -> typing.Tuple[str, ...]:
+        return tuple(x for x in path.replace("\\", "/").split("/") if x and x != ".")
+
+    @staticmethod
+    def Descend(subExcludes: "GoFilter.SubExcludesType", name: str) -> "GoFilter.SubExcludesType":
+        # what is left of the sub-path excludes inside the named subdirectory
+        name = os.path.normcase(name)
+        return tuple(x[1:] for x in subExcludes if len(x) > 1 and GoFilter._Compile((x[0],)).match(name))
+
+    @staticmethod
+    def IsSubExcluded(subExcludes: "GoFilter.SubExcludesType", name: str) -> bool:
+        name = os.path.normcase(name)
+        return any(len(x) == 1 and GoFilter._Compile(x).match(name) for x in subExcludes)
+
     def Match(self, text: str) -> typing.Literal[-1, 1]:
-        if any(fnmatch.fnmatch(text, x) for x in self.Includes):
+        text = os.path.normcase(text)
+        if self._IncludeRegex is not None and self._IncludeRegex.match(text):
             return 1
-        if any(fnmatch.fnmatch(text, x) for x in self.Excludes):
+        if self._ExcludeRegex is not None and self._ExcludeRegex.match(text):
             return -1
         return 1
 
 
+class PathScanner():
+    # ignored files by (st_dev, st_ino); ignored directories by (st_dev, st_ino) and as a trie of normalized path components
+    IgnoredPathsType = typing.Tuple[typing.Set[typing.Tuple[int, int]], typing.Set[typing.Tuple[int, int]], dict]
+
+    def __init__(self, extensions: typing.List[str], includeModX: bool, includeHidden: bool, ignoreGofilters: bool,
+                 knownDirectories: typing.Optional[typing.Dict[typing.Tuple[str, bool], DirectoryCacheItem]] = None,
+                 threads: int = 1):
+        self.Extensions = extensions
+        self.IncludeModX = includeModX
+        self.IncludeHidden = includeHidden
+        self.IgnoreGofilters = ignoreGofilters
+
+        # directories from a previous scan; reused as long as their stamps didn't change
+        self.KnownDirectories = knownDirectories if knownDirectories is not None else {}
+        self.ScannedDirectories: typing.Dict[typing.Tuple[str, bool], DirectoryCacheItem] = {}
+
+        # directories are fetched ahead of time by the pool, but always consumed in walk order by the calling thread
+        self._Executor = concurrent.futures.ThreadPoolExecutor(threads) if threads > 1 else None
+        self._Pending: typing.Dict[typing.Tuple[str, bool], concurrent.futures.Future] = {}
+        self._PendingLock = threading.Lock()
+
+        # resolved paths of every directory and link seen by _RealPath, for the whole scan
+        self._RealPaths: typing.Dict[str, str] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _, __, ___):
+        if self._Executor is not None:
+            self._Executor.shutdown(wait=False, cancel_futures=True)
+            self._Executor = None
+
+    @staticmethod
+    def _GetIgnored(ignoredPaths: typing.Optional[typing.List[str]]) -> "PathScanner.IgnoredPathsType":
+        # stat the ignored paths once; every scanned entry already carries its own stat data
+        ignoredFiles = set()
+        ignoredDirectories = set()
+        ignoredTrie = {}
+        for ignoredPath in (ignoredPaths or []):
+            try:
+                s = os.stat(ignoredPath)
+            except OSError:
+                continue
+            if stat.S_ISDIR(s.st_mode):
+                ignoredDirectories.add((s.st_dev, s.st_ino))
+                node = ignoredTrie
+                for component in PathScanner._SplitPath(os.path.abspath(ignoredPath)):
+                    node = node.setdefault(component, {})
+                node[None] = True
+            else:
+                ignoredFiles.add((s.st_dev, s.st_ino))
+        return (ignoredFiles, ignoredDirectories, ignoredTrie)
+
+    @staticmethod
+    def _SplitPath(path: str) -> typing.List[str]:
+        return [x for x in os.path.normcase(os.path.normpath(path)).split(os.sep) if x]
+
+    @staticmethod
+    def _IsUnderIgnored(ignoredTrie: dict, path: str) -> bool:
+        node = ignoredTrie
+        for component in PathScanner._SplitPath(path):
+            node = node.get(component)
+            if node is None:
+                return False
+            if None in node:
+                return True
+        return False
+
+    @staticmethod
+    def _GetFileId(entry: os.DirEntry) -> typing.Optional[typing.Tuple[int, int]]:
+        try:
+            # DirEntry.stat() doesn't fill in st_dev and st_ino on windows
+            s = os.stat(entry.path) if Utils.IsWindows() else entry.stat()
+        except OSError:
+            return None
+        return (s.st_dev, s.st_ino)
+
+    _MaxLinkDepth = 40
+
+    def _RealPath(self, path: str) -> str:
+        # os.path.realpath, but remembering every resolved prefix: links into /etc/alternatives and the like
+        # mostly go through the same few directories and links
+        if Utils.IsWindows():
+            return os.path.realpath(path)
+        try:
+            return self._Resolve(path, 0)
+        except OSError:
+            # a link loop; realpath has its own rules for those
+            return os.path.realpath(path)
+
+    def _Resolve(self, path: str, depth: int) -> str:
+        if depth > PathScanner._MaxLinkDepth:
+            raise OSError("too many levels of symbolic links")
+
+        resolved = self._RealPaths.get(path)
+        if resolved is not None:
+            return resolved
+
+        (parent, name) = os.path.split(path)
+        if not name:
+            return path
+        resolved = self._Resolve(parent, depth)
+        if name == "..":
+            resolved = os.path.dirname(resolved)
+        elif name != ".":
+            resolved = os.path.join(resolved, name)
+
+            try:
+                target = os.readlink(resolved)
+            except OSError:
+                # not a link, or missing; realpath keeps those as they are too
+                target = None
+
+            if target is not None:
+                # the parent is already resolved, so ".." can be applied as is
+                current = os.sep if os.path.isabs(target) else os.path.dirname(resolved)
+                for component in target.split(os.sep):
+                    if component in ("", "."):
+                        continue
+                    elif component == "..":
+                        current = os.path.dirname(current)
+                    else:
+                        current = self._Resolve(os.path.join(current, component), depth + 1)
+                resolved = current
+
+        self._RealPaths[path] = resolved
+        return resolved
+
+    def Prefetch(self, targetedPaths: typing.List[str], recursive: bool,
+                 ignoredPaths: typing.Optional[typing.List[str]] = None):
+        if self._Executor is None:
+            return
+
+        ignored = PathScanner._GetIgnored(ignoredPaths)
+        for targetedPath in targetedPaths:
+            if targetedPath:
+                self._Prefetch(os.path.abspath(targetedPath), (), recursive, ignored)
+
+    def ScanPaths(self, targetedPaths: typing.List[str], recursive: bool,
+                  ignoredPaths: typing.Optional[typing.List[str]] = None) -> typing.List[MatchCacheItem]:
+        return list(self.IterPaths(targetedPaths, recursive, ignoredPaths))
+
+    def IterPaths(self, targetedPaths: typing.List[str], recursive: bool,
+                  ignoredPaths: typing.Optional[typing.List[str]] = None) -> typing.Generator[MatchCacheItem, None, None]:
+        # directories are only scanned as the items are consumed
+        matchingPaths = set()
+        seenRoots = set()
+
+        ignored = PathScanner._GetIgnored(ignoredPaths)
+
+        pathQueue = queue.SimpleQueue()
+        for i in targetedPaths:
+            pathQueue.put(i)
+
+        while not pathQueue.empty():
+            targetedPath = pathQueue.get()
+            if not targetedPath:
+                continue
+
+            if os.path.isfile(targetedPath):
+                abspath = os.path.normcase(os.path.normpath(os.path.abspath(targetedPath)))
+                file = os.path.split(abspath)[1]
+                if abspath in matchingPaths:
+                    continue
+                item = MatchCacheItem(abspath, file)
+                if os.path.islink(abspath):
+                    item.linkTarget = self._RealPath(abspath)
+                try:
+                    s = os.stat(abspath)
+                    item.fileId = (s.st_dev, s.st_ino)
+                except OSError:
+                    pass
+                matchingPaths.add(abspath)
+                yield item
+                continue
+
+            # duplicate roots (eg. repeated PATH entries) can't add anything new
+            root = os.path.abspath(targetedPath)
+            rootKey = os.path.normcase(root)
+            if rootKey in seenRoots:
+                continue
+            seenRoots.add(rootKey)
+
+            for directory in self._Walk(root, recursive, ignored):
+                for item in directory.files:
+                    if item.path in matchingPaths:
+                        continue
+                    matchingPaths.add(item.path)
+                    yield item
+
+                for subInclude in directory.subIncludes:
+                    pathQueue.put(subInclude)
+
+    def _Walk(self, root: str, recursive: bool, ignored: "PathScanner.IgnoredPathsType") \
+            -> typing.Generator[DirectoryCacheItem, None, None]:
+        # same (pre)order as a topdown os.walk
+        stack = [(root, ())]
+        while stack:
+            directory = self._GetDirectory(*stack.pop(), recursive, ignored)
+            yield directory
+
+            if recursive:
+                stack.extend((x, directory.GetChildExcludes(x)) for x in reversed(directory.directories))
+
+    def _GetDirectory(self, path: str, inheritedExcludes: GoFilter.SubExcludesType, recursive: bool,
+                      ignored: "PathScanner.IgnoredPathsType") -> DirectoryCacheItem:
+        key = (path, recursive)
+        if key in self.ScannedDirectories:
+            return self.ScannedDirectories[key]
+
+        with self._PendingLock:
+            future = self._Pending.get(key)
+        if future is not None:
+            directory = future.result()
+            if directory.inheritedExcludes != inheritedExcludes:
+                directory = self._LoadDirectory(path, inheritedExcludes, recursive, ignored)
+        else:
+            directory = self._LoadDirectory(path, inheritedExcludes, recursive, ignored)
+
+        self.ScannedDirectories[key] = directory
+        return directory
+
+    def _Prefetch(self, path: str, inheritedExcludes: GoFilter.SubExcludesType, recursive: bool,
+                  ignored: "PathScanner.IgnoredPathsType"):
+        key = (path, recursive)
+        with self._PendingLock:
+            if key in self._Pending or self._Executor is None:
+                return
+            try:
+                self._Pending[key] = self._Executor.submit(self._FetchDirectory, path, inheritedExcludes, recursive, ignored)
+            except RuntimeError:
+                # already shut down
+                pass
+
+    def _FetchDirectory(self, path: str, inheritedExcludes: GoFilter.SubExcludesType, recursive: bool,
+                        ignored: "PathScanner.IgnoredPathsType") -> DirectoryCacheItem:
+        # runs on the pool; queues everything the walk will need next
+        directory = self._LoadDirectory(path, inheritedExcludes, recursive, ignored)
+
+        if recursive:
+            for subdirectory in directory.directories:
+                self._Prefetch(subdirectory, directory.GetChildExcludes(subdirectory), recursive, ignored)
+        for subInclude in directory.subIncludes:
+            self._Prefetch(subInclude, (), recursive, ignored)
+
+        return directory
+
+    def _LoadDirectory(self, path: str, inheritedExcludes: GoFilter.SubExcludesType, recursive: bool,
+                       ignored: "PathScanner.IgnoredPathsType") -> DirectoryCacheItem:
+        # a directory is rescanned when an ancestor's gofilter changed what it excludes below
+        known = self.KnownDirectories.get((path, recursive))
+        if known is not None and known.inheritedExcludes == inheritedExcludes and known.IsUpToDate():
+            return known
+        return self._ScanDirectory(path, inheritedExcludes, recursive, ignored, known)
+
+    def _ScanDirectory(self, path: str, inheritedExcludes: GoFilter.SubExcludesType, recursive: bool,
+                       ignored: "PathScanner.IgnoredPathsType", known: typing.Optional[DirectoryCacheItem] = None) \
+            -> DirectoryCacheItem:
+        (ignoredFiles, ignoredDirectories, ignoredTrie) = ignored
+
+        directory = DirectoryCacheItem(path, recursive)
+        directory.inheritedExcludes = inheritedExcludes
+        directory.stamp = DirectoryCacheItem.GetStamp(path)
+        if directory.Missing:
+            return directory
+
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            return directory
+
+        # same split as os.walk: anything that is (or points to) a directory is a directory
+        dirs: typing.List[os.DirEntry] = []
+        files: typing.List[os.DirEntry] = []
+        for entry in entries:
+            try:
+                isDir = entry.is_dir()
+            except OSError:
+                isDir = False
+            (dirs if isDir else files).append(entry)
+
+        if not self.IgnoreGofilters:
+            gofilterEntry = next((x for x in files if x.name == ".gofilter"), None) \
+                            or next((x for x in files if x.name == "go.filter"), None)
+
+            if gofilterEntry:
+                files.remove(gofilterEntry)
+                directory.filterStamp = DirectoryCacheItem.GetFilterStamp(path, gofilterEntry.name)
+                if known is not None and known.gofilter is not None and known.filterStamp == directory.filterStamp:
+                    gofilter = known.gofilter
+                else:
+                    gofilter = GoFilter.Load(gofilterEntry.path, directory.filterStamp)
+                directory.gofilter = gofilter
+
+                dirs = [x for x in dirs if gofilter.Match(x.name) != -1]
+                files = [x for x in files if gofilter.Match(x.name) != -1]
+
+                for item in gofilter.SubIncludes:
+                    abspath = os.path.abspath(os.path.join(path, os.path.normcase(item)))
+                    directory.subIncludes.append(abspath)
+
+            subExcludes = inheritedExcludes + (directory.gofilter.SubExcludeParts if directory.gofilter else ())
+            if subExcludes:
+                dirs = [x for x in dirs if not GoFilter.IsSubExcluded(subExcludes, x.name)]
+                files = [x for x in files if not GoFilter.IsSubExcluded(subExcludes, x.name)]
+
+        if recursive and (ignoredDirectories or not self.IncludeHidden):
+            keptDirs = []
+            for entry in dirs:
+                if not self.IncludeHidden and Utils.IsHiddenEntry(entry):
+                    continue
+
+                if ignoredDirectories:
+                    if PathScanner._GetFileId(entry) in ignoredDirectories or \
+                            PathScanner._IsUnderIgnored(ignoredTrie, entry.path):
+                        continue
+
+                keptDirs.append(entry)
+            dirs = keptDirs
+
+        for entry in files:
+            if not self.IncludeHidden:
+                if Utils.IsHiddenEntry(entry):
+                    continue
+            if ignoredFiles and PathScanner._GetFileId(entry) in ignoredFiles:
+                continue
+
+            (_, extension) = os.path.splitext(entry.name)
+            canAdd = extension.lower() in self.Extensions
+            if not canAdd and self.IncludeModX:
+                try:
+                    s = entry.stat()
+                    canAdd = stat.S_ISREG(s.st_mode) and Utils.IsExecutableStat(s)
+                except OSError:
+                    pass
+
+            if canAdd:
+                item = MatchCacheItem(entry.path, entry.name)
+                if entry.is_symlink():
+                    item.linkTarget = self._RealPath(entry.path)
+                item.fileId = PathScanner._GetFileId(entry)
+                directory.files.append(item)
+
+        if recursive:
+            # like os.walk, don't descend into symlinked directories
+            directory.directories = [x.path for x in dirs if not x.is_symlink()]
+
+        return directory
+
+
 class Utils():
     __isWindows = None
     @staticmethod
@@ -712,6 +2028,24 @@ class Utils():
             return None
         return os.path.split(scriptPath)[0]
 
+    @staticmethod
+    def GetCacheDir() -> typing.Optional[str]:
+        # per user, since the script's own directory is often shared or read-only
+        if Utils.IsWindows():
+            base = os.environ.get("LOCALAPPDATA")
+        else:
+            base = os.environ.get("XDG_CACHE_HOME")
+            if not base or not os.path.isabs(base):
+                home = os.path.expanduser("~")
+                base = os.path.join(home, ".cache") if os.path.isabs(home) else None
+
+        if base:
+            return os.path.join(base, "go.caches")
+        scriptDir = Utils.GetScriptDir()
+        if scriptDir is None:
+            return None
+        return os.path.join(scriptDir, "go.caches")
+
     @staticmethod
     def IsHidden(path: str) -> bool:
         if Utils.IsWindows():
@@ -721,145 +2055,63 @@ class Utils():
             filename = os.path.split(path)[1]
             return filename[0] == "."
 
+    @staticmethod
+    def IsHiddenEntry(entry: os.DirEntry) -> bool:
+        if Utils.IsWindows():
+            # windows fills the attributes in while listing the directory; no extra syscall
+            try:
+                return bool(entry.stat().st_file_attributes & stat.FILE_ATTRIBUTE_HIDDEN)
+            except OSError:
+                return False
+        else:
+            return entry.name[0] == "."
+
+    __executableIds = None
+    @staticmethod
+    def IsExecutableStat(s: os.stat_result) -> bool:
+        # equivalent of os.access(X_OK), without the extra syscall
+        if Utils.IsWindows():
+            return True
+
+        mode = s.st_mode
+        if not mode & (stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH):
+            return False
+
+        if Utils.__executableIds is None:
+            Utils.__executableIds = (os.getuid(), {os.getgid(), *os.getgroups()})
+        (uid, gids) = Utils.__executableIds
+
+        if uid == 0:
+            return True
+        if s.st_uid == uid:
+            return bool(mode & stat.S_IXUSR)
+        if s.st_gid in gids:
+            return bool(mode & stat.S_IXGRP)
+        return bool(mode & stat.S_IXOTH)
+
     @staticmethod
     def ParsePathsForFiles(targetedPaths: typing.List[str], extensions: typing.List[str],
                            recursive: bool, includeModX: bool, includeHidden: bool,
                            ignoredPaths: typing.Optional[typing.List[str]] = None) -> \
             typing.List[typing.Tuple[str, str]]:
-        matches = []
-        matchingPaths = set()
-
-        ignoredFiles = [os.path.normcase(os.path.normpath(x)) for x in ignoredPaths if os.path.isfile(x)] if ignoredPaths else []
-        ignoredDirectories = [os.path.normcase(os.path.normpath(x)) for x in ignoredPaths if os.path.isdir(x)] if ignoredPaths else []
+        scanner = PathScanner(extensions, includeModX, includeHidden, config.IgnoreGofilters)
+        return [(x.path, x.filename) for x in scanner.ScanPaths(targetedPaths, recursive, ignoredPaths)]
 
-        pathQueue = queue.SimpleQueue()
-        for i in targetedPaths:
-            pathQueue.put(i)
-
-        while not pathQueue.empty():
-            targetedPath = pathQueue.get()
-
-            if os.path.isfile(targetedPath):
-                abspath = os.path.normcase(os.path.normpath(os.path.abspath(targetedPath)))
-                file = os.path.split(abspath)[1]
-                if abspath in matchingPaths:
-                    continue
-                matches.append((abspath, file))
-                matchingPaths.add(abspath)
-            else:
-                for (root, dirs, files) in os.walk(targetedPath, topdown=True):
-                    if not config.IgnoreGofilters:
-                        if ".gofilter" in files:
-                            gofilterName = ".gofilter"
-                        elif "go.filter" in files:
-                            gofilterName = "go.filter"
-                        else:
-                            gofilterName = None
-                        
-                        if gofilterName:
-                            files.remove(gofilterName)
-                            gofilter = GoFilter(os.path.join(root, gofilterName))
-
-                            for dir in list(dirs):
-                                if gofilter.Match(dir) == -1:
-                                    dirs.remove(dir)
-
-                            for file in list(files):
-                                if gofilter.Match(file) == -1:
-                                    files.remove(file)
-
-                            for item in gofilter.SubIncludes:
-                                abspath = os.path.abspath(os.path.join(root, os.path.normcase(item)))
-                                pathQueue.put(abspath)
-
-                    if recursive and (ignoredDirectories or not includeHidden):
-                        dirs_copy = list(dirs)
-                        for dir in dirs_copy:
-                            abspath = os.path.abspath(os.path.join(root, dir))
-                            if not includeHidden and Utils.IsHidden(abspath):
-                                dirs.remove(dir)
-                                continue
-
-                            ignored = False
-                            normalized = os.path.normcase(os.path.normpath(abspath))
-                            for ignoredDirectory in ignoredDirectories:
-                                if os.path.samefile(normalized, ignoredDirectory) \
-                                        or normalized.startswith(ignoredDirectory):
-                                    ignored = True
-                                    break
-                            if ignored:
-                                dirs.remove(dir)
-                                continue
-
-                    for file in files:
-                        fullpath = os.path.join(root, file)
-                        if "/" in file or "\\" in file:
-                            file = os.path.split(file)[1]
-
-                        if not includeHidden:
-                            if Utils.IsHidden(fullpath):
-                                continue
-                        if ignoredFiles:
-                            if any(os.path.samefile(fullpath, x) for x in ignoredFiles):
-                                continue
-
-                        canAdd = False
-                        if includeModX:
-                            if os.path.isfile(fullpath) and os.access(fullpath, os.X_OK):
-                                canAdd = True
-                        if not canAdd:
-                            (_, extension) = os.path.splitext(file)
-                            extension = extension.lower()
-                            canAdd = extension in extensions
-
-                        if canAdd:
-                            abspath = os.path.abspath(fullpath)
-                            if abspath in matchingPaths:
-                                continue
-                            matchingPaths.add(abspath)
-                            matches.append((abspath, file))
-
-                    if not recursive:
-                        break
-
-        return matches
-
-    __Compare_RegexObject = None
-    __Compare_SequenceMatcher = difflib.SequenceMatcher()
     @staticmethod
     def ComparePathAndPattern(file: str, pattern: str, fuzzy: bool, asRegex: bool, asWildcard: bool) \
             -> float:
-        if Utils.IsWindows():
-            file = file.lower()
-        (filename, _) = os.path.splitext(file)
-
-        if not fuzzy:
-            if Utils.IsWindows():
-                pattern = pattern.lower()
-
-            return int(filename == pattern or file == pattern)
-        elif asRegex:
-            if Utils.__Compare_RegexObject is None:
-                Utils.__Compare_RegexObject = re.compile(pattern, re.I)
+        return TargetMatcher(pattern, fuzzy, asRegex, asWildcard).Score(file)
 
-            if Utils.__Compare_RegexObject.match(filename) or Utils.__Compare_RegexObject.match(file):
-                return 1
-            else:
-                return 0
-        elif asWildcard:
-            if Utils.IsWindows():
-                pattern = pattern.lower()
-
-            return int(fnmatch.fnmatch(filename, pattern) or fnmatch.fnmatch(file, pattern))
-        else:
-            if Utils.IsWindows():
-                pattern = pattern.lower()
+    @staticmethod
+    def GetTrigrams(text: str) -> typing.Set[str]:
+        # padded, so that short names and their first/last characters still produce trigrams
+        padded = "\0\0" + text + "\0\0"
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
 
-            sm = Utils.__Compare_SequenceMatcher
-            sm.set_seq2(pattern)
-            sm.set_seq1(filename); r1 = sm.ratio()
-            sm.set_seq1(file); r2 = sm.ratio()
-            return max(r1, r2)
+    @staticmethod
+    def NormalizeName(name: str) -> str:
+        # file names are compared case-insensitively on windows only
+        return name.lower() if Utils.IsWindows() else name
 
     @staticmethod
     def PathContains(path: str, substring: str) -> bool:
@@ -942,11 +2194,43 @@ class Utils():
 
         return list(Utils.SAVED_STDIN)
 
+    SAVED_STDIN_COMPACT = None
+    @staticmethod
+    def ReadStdinCompact() -> "Utils.CompactStringList":
+        # compact lists are never changed, so every /papply can get the same one
+        if Utils.SAVED_STDIN_COMPACT is None:
+            Utils.SAVED_STDIN_COMPACT = Utils.CompactStringList.FromLines(sys.stdin, True)
+        return Utils.SAVED_STDIN_COMPACT
+
+    @staticmethod
+    def StreamStdin() -> typing.Generator[str, None, None]:
+        # same lines as ReadStdin, but yielded as soon as they arrive
+        for line in sys.stdin:
+            line = line.rstrip("\n")
+            if line:
+                yield line
+
     @staticmethod
     def ReadAllLines(file: str) -> typing.List[str]:
         with open(file, "r", encoding="utf-8") as f:
             return [x.rstrip("\r\n") for x in f.readlines()]
 
+    @staticmethod
+    def StreamLines(file: str) -> typing.Generator[str, None, None]:
+        with open(file, "r", encoding="utf-8") as f:
+            for line in f:
+                yield line.rstrip("\r\n")
+
+    @staticmethod
+    def PeekIterator(items: typing.Iterable[object]) -> typing.Optional[typing.Iterator[object]]:
+        # None if there's nothing to iterate; otherwise an iterator that still starts with the peeked item
+        iterator = iter(items)
+        try:
+            first = next(iterator)
+        except StopIteration:
+            return None
+        return itertools.chain((first,), iterator)
+
     @staticmethod
     def CaptureGoOutput(command: str, stdinLines: typing.List[str] = None) -> typing.List[str]:
         lines = []
@@ -1032,10 +2316,10 @@ class Utils():
         exit(0)
 
     @staticmethod
-    def Batch(list: typing.List[object], batchSize: int) -> typing.Generator[typing.List[object], None, None]:
-        length = len(list)
-        for i in range(0, length, batchSize):
-            yield list[i:min(i + batchSize, length)]
+    def Batch(items: typing.Iterable[object], batchSize: int) -> typing.Generator[typing.List[object], None, None]:
+        iterator = iter(items)
+        while batch := list(itertools.islice(iterator, batchSize)):
+            yield batch
 
     @staticmethod
     def CreateScriptFile(items: typing.List[typing.List[str]], echoOff: bool, unsafe: bool = False) -> str:
@@ -1295,27 +2579,161 @@ class Utils():
         if len(accumulator) > 0:
             result.append("".join(accumulator))
 
-        return result
+        return result
+
+    class RepeatGenerator():
+        def __init__(self, item, count: int):
+            self.item = item
+            self.count = count
+            self.i = 0
+
+        def __len__(self):
+            return self.count
+
+        def __iter__(self):
+            self.i = 0
+            return self
+
+        def __next__(self):
+            if self.i < self.count:
+                self.i += 1
+                return self.item
+            else:
+                raise StopIteration
+
+    class CompactStringList():
+        # strings kept as one utf-8 buffer and the offsets where each of them ends; decoded only when read
+        _ChunkSize = 4096
+
+        def __init__(self, items: typing.Iterable[str] = ()):
+            self.buffer = bytearray()
+            self.ends = array.array("Q")
+            self.Extend(items)
+
+        @staticmethod
+        def FromLines(file: typing.TextIO, skipEmpty: bool) -> "Utils.CompactStringList":
+            # same lines as iterating the file and stripping the newlines, but split in big blocks instead
+            result = Utils.CompactStringList()
+            rest = ""
+            while block := file.read(1 << 22):
+                lines = (rest + block).split("\n")
+                rest = lines.pop()
+                result.Extend(filter(None, lines) if skipEmpty else lines)
+            if rest:
+                result.Extend([rest])
+            return result
+
+        def Extend(self, items: typing.Iterable[str]):
+            # encoded in chunks, so that neither all the strings nor all the encoded ones exist at once
+            iterator = iter(items)
+            while chunk := list(itertools.islice(iterator, 16 * Utils.CompactStringList._ChunkSize)):
+                joined = "".join(chunk)
+                if joined.isascii():
+                    # one byte per character, so the lengths don't need encoding every string
+                    lengths = map(len, chunk)
+                    data = joined.encode("ascii")
+                else:
+                    encoded = [x.encode("utf-8", "surrogatepass") for x in chunk]
+                    lengths = map(len, encoded)
+                    data = b"".join(encoded)
+                self.ends.extend(itertools.islice(itertools.accumulate(lengths, initial=len(self.buffer)), 1, None))
+                self.buffer += data
+
+        def __len__(self):
+            return len(self.ends)
+
+        def __getitem__(self, index):
+            if isinstance(index, slice):
+                return [self[i] for i in range(*index.indices(len(self.ends)))]
+            if index < 0:
+                index += len(self.ends)
+            if not 0 <= index < len(self.ends):
+                raise IndexError(index)
+            start = self.ends[index - 1] if index > 0 else 0
+            return self.buffer[start:self.ends[index]].decode("utf-8", "surrogatepass")
+
+        def __iter__(self):
+            # decodes a chunk of strings at once; if it's all ascii, byte offsets are character offsets too
+            buffer = memoryview(self.buffer)
+            chunkSize = Utils.CompactStringList._ChunkSize
+            for first in range(0, len(self.ends), chunkSize):
+                chunkStart = self.ends[first - 1] if first > 0 else 0
+                ends = list(map((-chunkStart).__add__, self.ends[first:first + chunkSize]))
+                text = str(buffer[chunkStart:chunkStart + ends[-1]], "utf-8", "surrogatepass")
+                if len(text) == ends[-1]:
+                    yield from map(text.__getitem__, map(slice, [0, *ends[:-1]], ends))
+                else:
+                    chunk = buffer[chunkStart:]
+                    yield from (str(chunk[start:end], "utf-8", "surrogatepass") for (start, end) in zip([0, *ends[:-1]], ends))
+
+    class ListView():
+        # the first count items of a list that's repeated forever, or of a list followed by padding forever
+        def __init__(self, items: typing.Sequence, count: int, padding: typing.Optional[str] = None):
+            self.items = items
+            self.count = count if len(items) > 0 or padding is not None else 0
+            self.padding = padding
+
+        @staticmethod
+        def Truncate(items: typing.Sequence, count: int) -> "Utils.ListView":
+            if isinstance(items, Utils.ListView):
+                # a prefix of a view is the same view, only shorter
+                return Utils.ListView(items.items, count, items.padding)
+            return Utils.ListView(items, count)
+
+        def __len__(self):
+            return self.count
+
+        def __getitem__(self, index: int):
+            if index < 0:
+                index += self.count
+            if not 0 <= index < self.count:
+                raise IndexError(index)
+            if index < len(self.items):
+                return self.items[index]
+            return self.items[index % len(self.items)] if self.padding is None else self.padding
+
+        def __iter__(self):
+            if self.padding is not None:
+                return itertools.islice(itertools.chain(self.items, itertools.repeat(self.padding)), self.count)
+            repetitions = -(-self.count // len(self.items)) if self.count > 0 else 0
+            return itertools.islice(itertools.chain.from_iterable(itertools.repeat(self.items, repetitions)), self.count)
+
+    class CrossJoinView():
+        # one column of the cross join of some lists, computed from the row index instead of being stored
+        # the last list varies the fastest, like with itertools.product
+        def __init__(self, lists: typing.List[typing.Sequence], column: int):
+            self.list = lists[column]
+            self.stride = math.prod(len(x) for x in lists[column + 1:])
+            self.outer = math.prod(len(x) for x in lists[:column])
+            self.count = self.outer * len(self.list) * self.stride
+
+        def __len__(self):
+            return self.count
+
+        def __getitem__(self, index):
+            if isinstance(index, slice):
+                return [self[i] for i in range(*index.indices(self.count))]
+            if index < 0:
+                index += self.count
+            if not 0 <= index < self.count:
+                raise IndexError(index)
+            return self.list[(index // self.stride) % len(self.list)]
+
+        def __iter__(self):
+            column = itertools.chain.from_iterable(itertools.repeat(self.list, self.outer))
+            return itertools.chain.from_iterable(itertools.repeat(x, self.stride) for x in column)
 
-    class RepeatGenerator():
-        def __init__(self, item, count: int):
-            self.item = item
-            self.count = count
-            self.i = 0
+    class JoinedView():
+        # the elements of some sequences joined together, without storing the joined strings
+        def __init__(self, parts: typing.List[typing.Sequence[str]]):
+            self.parts = parts
+            self.count = min(len(x) for x in parts)
 
         def __len__(self):
             return self.count
 
         def __iter__(self):
-            self.i = 0
-            return self
-
-        def __next__(self):
-            if self.i < self.count:
-                self.i += 1
-                return self.item
-            else:
-                raise StopIteration
+            return map("".join, zip(*self.parts))
 
     class PriorityModifier():
         __Inited = None
@@ -1428,6 +2846,14 @@ class GoConfig:
         self.IncludeHidden = False
 
         self.CacheInvalidationTime = 1
+        self.ScanThreads = 4
+        self.CacheSlots = 8
+        self.CacheSizeLimit = 64
+        self.ServerRevalidationTime = 2
+        self.MemoSize = 256
+        self.RunServer = False
+        self.StopServer = False
+        self.LazyResolution = False
         self.UsePathCache = False
         self.DisablePathCache = False
         self.RefreshPathCache = False
@@ -1448,6 +2874,8 @@ class GoConfig:
         self.DryRun = False
         self.AlwaysYes = False
         self.PrintTarget = False
+        self.WhichFormat: typing.Optional[str] = None
+        self.CompletionPrefix: typing.Optional[str] = None
         self.AutoPipe = False
 
         self.ChangeWorkingDirectory = False
@@ -1460,6 +2888,7 @@ class GoConfig:
         self.Parallel = False
         self.Batched = False
         self.ParallelLimit = None
+        self.StreamApply = False
         self.Shell = False
         self.AsShellScript = False
         self.EchoOff = True
@@ -1475,6 +2904,7 @@ class GoConfig:
 
         self.RepeatCount = None
         self.CrossJoin = False
+        self.CompactApply = False
 
         self.ExternalModules: typing.Dict[str, ExternalModule] = {}
 
@@ -1547,11 +2977,23 @@ class GoConfig:
             self.TryParseArgument("/autosilent")
         if config.pop("NoFuzzyMatch", False):
             self.TryParseArgument("/nofuzzy")
+        if config.pop("AlwaysLazy", False):
+            self.TryParseArgument("/lazy")
         if "IncludeHidden" in config:
             value = bool(config.pop("IncludeHidden"))
             self.TryParseArgument("/hidden" + ("+" if value else "-"))
         if "CacheInvalidationTime" in config:
             self.CacheInvalidationTime = float(config.pop("CacheInvalidationTime"))
+        if "ScanThreads" in config:
+            self.ScanThreads = max(1, int(config.pop("ScanThreads")))
+        if "CacheSlots" in config:
+            self.CacheSlots = max(1, int(config.pop("CacheSlots")))
+        if "CacheSizeLimit" in config:
+            self.CacheSizeLimit = float(config.pop("CacheSizeLimit"))
+        if "ServerRevalidationTime" in config:
+            self.ServerRevalidationTime = float(config.pop("ServerRevalidationTime"))
+        if "MemoSize" in config:
+            self.MemoSize = max(0, int(config.pop("MemoSize")))
         if "DefaultArguments" in config:
             args = config.pop("DefaultArguments")
             for arg in args:
@@ -1599,7 +3041,6 @@ class GoConfig:
             else:
                 if path not in self.TargetedPaths:
                     self.TargetedPaths.append(path)
-            self.DisablePathCache = True
         elif lower.startswith("exc"):
             action = lower[3]
             path = os.path.abspath(lower[4:])
@@ -1610,7 +3051,6 @@ class GoConfig:
             else:
                 if path not in self.IgnoredPaths:
                     self.IgnoredPaths.append(path)
-            self.DisablePathCache = True
         elif lower.startswith("ext"):
             action = lower[3]
             extension = lower[4:]
@@ -1621,10 +3061,8 @@ class GoConfig:
             else:
                 if extension not in self.TargetedExtensions:
                     self.TargetedExtensions.append(extension)
-            self.DisablePathCache = True
         elif lower == "executables":
             self.IncludeAnyExecutables = not self.IncludeAnyExecutables
-            self.DisablePathCache = True
         elif lower.startswith("hidden"):
             action = lower[6] if len(lower) == 8 else None
             if action == "+":
@@ -1633,7 +3071,6 @@ class GoConfig:
                 self.IncludeHidden = False
             else:
                 self.IncludeHidden = not self.IncludeHidden
-            self.DisablePathCache = True
 
         elif lower.startswith("cache"):
             if len(lower) >= 6:
@@ -1647,14 +3084,18 @@ class GoConfig:
                 self.UsePathCache = True
         elif lower == "refresh":
             self.RefreshPathCache = True
+        elif lower == "server":
+            self.RunServer = True
+        elif lower == "server-stop":
+            self.StopServer = True
         elif lower == "nofuzzy":
             self.FuzzyMatch = False
+        elif lower == "lazy":
+            self.LazyResolution = True
         elif lower == "duplinks":
             self.IgnoreDuplicateLinks = False
-            self.DisablePathCache = True
         elif lower == "nofilters":
             self.IgnoreGofilters = True
-            self.DisablePathCache = True
 
         elif lower == "regex":
             self.RegexTargetMatch = True
@@ -1710,6 +3151,12 @@ class GoConfig:
             self.PrintTarget = True
             self.TryParseArgument("/dry")
             self.TryParseArgument("/qmax")
+        elif lower in ("which", "which-nul"):
+            self.WhichFormat = "nul" if lower == "which-nul" else "json"
+            self.TryParseArgument("/qmax")
+        elif lower.startswith("complete-"):
+            self.CompletionPrefix = argument[9:]
+            self.TryParseArgument("/qmax")
         elif lower == "autopipe":
             if not sys.stdin.isatty():
                 self.AutoPipe = True
@@ -1748,6 +3195,8 @@ class GoConfig:
             self.Batched = True
         elif lower.startswith("limit-"):
             self.ParallelLimit = int(lower[6:])
+        elif lower == "stream":
+            self.StreamApply = True
         elif lower == "shell":
             self.Shell = True
         elif lower.startswith("asscript"):
@@ -1777,12 +3226,28 @@ class GoConfig:
             self.RepeatCount = int(lower[7:])
         elif lower == "crossjoin":
             self.CrossJoin = True
+        elif lower == "compact":
+            self.CompactApply = True
 
         else:
             return False
 
         return True
 
+    def GetCacheFingerprint(self, pathVariable: typing.Optional[str] = None) -> str:
+        # everything that changes which files a scan finds; each distinct combination gets its own cache slot
+        settings = [
+            self.TargetedExtensions,
+            self.TargetedPaths,
+            self.IgnoredPaths,
+            self.IncludeAnyExecutables,
+            self.IncludeHidden,
+            self.IgnoreDuplicateLinks,
+            self.IgnoreGofilters,
+            os.environ.get("PATH", "") if pathVariable is None else pathVariable
+        ]
+        return hashlib.sha1(json.dumps(settings).encode("utf-8", "surrogateescape")).hexdigest()[:16]
+
     def Validate(self) -> bool:
         if self.Parallel and not self.WaitForExit:
             Cprint(">>>/fork doesn't do anything with /parallel", level=1)
@@ -1911,13 +3376,23 @@ class GoConfig:
         # endregion
 
         if len(self.ApplyLists) == 0:
+            self.StreamApply = False
             repeat = 1 if self.RepeatCount is None else self.RepeatCount
             return [Utils.RepeatGenerator(x, repeat) for x in targetArguments]
 
+        if self.StreamApply and (self.RepeatCount is not None or self.Rollover or self.CrossJoin
+                                 or any(x.ShouldTranspose for x in self.ApplyLists)
+                                 or any(x.SourceType == "u" and self.ApplyLists[int(x.Source)].ShouldTranspose for x in self.ApplyLists)):
+            Cprint(">>>/stream can't be used with /repeat, /rollover, /crossjoin or tsp; reading all apply lists first", level=1)
+            self.StreamApply = False
+
         # region generate lists
 
         duplicatesToDo = []
         usesToDo = []
+        stdinStreams = None
+        if self.StreamApply:
+            stdinStreams = iter(itertools.tee(Utils.StreamStdin(), sum(1 for x in self.ApplyLists if x.SourceType == "p")))
 
         for i in range(len(self.ApplyLists)):
             applyArgument = self.ApplyLists[i]
@@ -1929,7 +3404,13 @@ class GoConfig:
                 duplicate = (self.ApplyLists[int(applyArgument.Source)], applyArgument)
                 duplicatesToDo.append(duplicate)
             elif applyArgument.SourceType == "f":
-                applyArgument.List = Utils.ReadAllLines(applyArgument.Source)
+                if self.StreamApply:
+                    applyArgument.List = Utils.StreamLines(applyArgument.Source)
+                elif self.CompactApply:
+                    with open(applyArgument.Source, "r", encoding="utf-8") as f:
+                        applyArgument.List = Utils.CompactStringList.FromLines(f, False)
+                else:
+                    applyArgument.List = Utils.ReadAllLines(applyArgument.Source)
             elif applyArgument.SourceType == "g":
                 applyArgument.List = Utils.CaptureGoOutput(applyArgument.Source)
             elif applyArgument.SourceType == "h":
@@ -1937,7 +3418,12 @@ class GoConfig:
             elif applyArgument.SourceType == "i":
                 applyArgument.List = applyArgument.Source.split(",")
             elif applyArgument.SourceType == "p":
-                applyArgument.List = Utils.ReadStdin()
+                if self.StreamApply:
+                    applyArgument.List = next(stdinStreams)
+                elif self.CompactApply:
+                    applyArgument.List = Utils.ReadStdinCompact()
+                else:
+                    applyArgument.List = Utils.ReadStdin()
             elif applyArgument.SourceType == "py":
                 pyapplyArguments = applyArgument.Source.split(",", 1)
                 modulePath = pyapplyArguments[0]
@@ -1948,19 +3434,32 @@ class GoConfig:
             elif applyArgument.SourceType == "r":
                 rangeArgumentsRegex = re.compile("-?\\d+(,-?\\d+){0,2}", re.I)
                 if rangeArgumentsRegex.match(applyArgument.Source):
-                    applyArgument.List = [str(x) for x in eval("range(" + applyArgument.Source + ")")]
+                    if self.StreamApply:
+                        applyArgument.List = map(str, eval("range(" + applyArgument.Source + ")"))
+                    elif self.CompactApply:
+                        applyArgument.List = Utils.CompactStringList(map(str, eval("range(" + applyArgument.Source + ")")))
+                    else:
+                        applyArgument.List = [str(x) for x in eval("range(" + applyArgument.Source + ")")]
             elif applyArgument.SourceType == "u":
                 # processed after all modifiers
                 reuse = (self.ApplyLists[int(applyArgument.Source)], applyArgument)
                 duplicatesToDo.append(reuse)
                 usesToDo.append(reuse)
 
+            if self.StreamApply and applyArgument.List is not None:
+                # waits for the first line only, so that an empty source still fails here
+                applyArgument.List = Utils.PeekIterator(applyArgument.List)
+
             if applyArgument.SourceType not in {"d", "u"} and not applyArgument.List:
                 Cprint(">>>apply list index %d is empty! exiting with failure... (%s)" % (i, applyArgument.SourceText), level=3)
                 return None
 
         for (sourceList, destList) in duplicatesToDo:
-            destList.List = list(sourceList.List)
+            if self.StreamApply:
+                (sourceList.List, destList.List) = itertools.tee(sourceList.List)
+            else:
+                # modifiers never change a list in place, so the duplicate can share it until one replaces it
+                destList.List = sourceList.List
         for (sourceList, destList) in usesToDo:
             destList.Modifiers = [*sourceList.Modifiers, *destList.Modifiers]
 
@@ -1969,87 +3468,24 @@ class GoConfig:
         # region process modifiers
 
         for applyArgument in self.ApplyLists:
-            for (modifierType, modifierArgument) in applyArgument.Modifiers:
-                if modifierType == "d":
-                    # already processed
-                    pass
-                elif modifierType == "e":
-                    applyArgument.List = [Utils.EscapeForShell(x) for x in applyArgument.List]
-                elif modifierType in {"f", "fi", "ff"}:
-                    convertFunc = lambda x: x
-                    if modifierType == "fi":
-                        convertFunc = lambda x: int(x)
-                    elif modifierType == "ff":
-                        convertFunc = lambda x: float(x)
-
-                    for i in range(len(applyArgument.List)):
-                        applyArgument.List[i] = modifierArgument % convertFunc(applyArgument.List[i])
-                elif modifierType == "fl":
-                    applyArgument.List = [modifierArgument.join(applyArgument.List)]
-                elif modifierType == "g":
-                    applyArgument.List = Utils.CaptureGoOutput(modifierArgument, applyArgument.List)
-                elif modifierType == "py":
-                    (modulePath, moduleArgument) = modifierArgument
-                    applyArgument.List = self._getOrInitExternalModule(modulePath).ModifyApplyList(applyArgument, applyArgument.List, moduleArgument)
-                elif modifierType == "rep":
-                    (x, y) = modifierArgument
-                    applyArgument.List = [t.replace(x, y) for t in applyArgument.List]
-                elif modifierType == "rm":
-                    regex = re.compile(modifierArgument, re.I)
-                    applyArgument.List = [x for x in applyArgument.List if regex.search(x)]
-                elif modifierType == "rs":
-                    (groupNumber, regexString) = modifierArgument
-                    regex = re.compile(regexString, re.I)
-                    for i in range(len(applyArgument.List)):
-                        match = regex.search(applyArgument.List[i])
-                        if match:
-                            groups = match.groups()
-                            if groupNumber <= regex.groups:
-                                applyArgument.List[i] = groups[groupNumber - 1]
-                            else:
-                                applyArgument.List[i] = match.group(0) # entire match
-                        else:
-                            applyArgument.List[i] = ""
-                elif modifierType == "s":
-                    (excludeInstead, expression) = modifierArgument
-                    slices = []
-                    for expr in expression.split(","):
-                        s = Utils.GetSliceFunc(expr)
-                        if s:
-                            slices.append(s)
-                    applyArgument.List = Utils.ApplySlices(slices, applyArgument.List, excludeInstead)
-                elif modifierType == "sp":
-                    pattern = modifierArgument
-                    newList = [re.split(pattern, x) for x in applyArgument.List]
-                    applyArgument.List = [x for l in newList for x in l if len(x) > 0]
-                elif modifierType == "ss":
-                    s = Utils.GetSliceFunc(modifierArgument)
-                    applyArgument.List = [s(x) for x in applyArgument.List]
-                elif modifierType == "strip":
-                    side, characters = modifierArgument
-                    side = (side or "").lower()
-                    if side == "l":
-                        stripper = str.lstrip
-                    elif side == "r":
-                        stripper = str.rstrip
-                    else:
-                        stripper = str.strip
-                    applyArgument.List = [stripper(x, characters) for x in applyArgument.List]
-                elif modifierType == "tsp":
-                    applyArgument.List = [applyArgument.List]
-                elif modifierType == "w":
-                    (inverted, pattern) = modifierArgument
-                    applyArgument.List = [x for x in applyArgument.List if fnmatch.fnmatch(x, pattern) is not inverted] # big brain inversion (== xor (== is not))
-                elif modifierType == "xtr":
-                    (groupNumber, pattern) = modifierArgument
-                    regex = re.compile(pattern, re.I)
-                    newList = []
-                    for i in applyArgument.List:
-                        newList.append(regex.findall(i))
-                    applyArgument.List = [x for l in newList for x in l]
+            items = applyArgument.List
+            # compact lists stay lazy between steps, so that the strings are only stored compacted
+            compact = self.CompactApply and not self.StreamApply and not applyArgument.ShouldTranspose
+            for step in self._CompileModifiers(applyArgument, self.StreamApply or compact):
+                items = step(items)
+
+            if compact:
+                applyArgument.List = items if isinstance(items, Utils.CompactStringList) else Utils.CompactStringList(items)
+            elif self.StreamApply or isinstance(items, list):
+                applyArgument.List = items
+            else:
+                applyArgument.List = list(items)
 
         # endregion
 
+        if self.StreamApply:
+            return self._StreamApplyRows(newArguments)
+
         # region calculate and adjust lengths
 
         # todo transposed lists behave unexpectedly
@@ -2058,10 +3494,7 @@ class GoConfig:
             for applyArgument in self.ApplyLists:
                 if applyArgument.ShouldTranspose:
                     continue
-                originalLength = len(applyArgument.List)
-
-                for i in range(self.RepeatCount - 1):
-                    applyArgument.List.extend(applyArgument.List[:originalLength])
+                applyArgument.List = Utils.ListView(applyArgument.List, len(applyArgument.List) * self.RepeatCount)
 
         if self.Rollover:
             maxOriginalLength = max(len(x.List) for x in self.ApplyLists)
@@ -2070,19 +3503,23 @@ class GoConfig:
                 if applyArgument.ShouldTranspose:
                     continue
                 originalLength = len(applyArgument.List)
+                if originalLength >= maxOriginalLength:
+                    continue
+                if originalLength == 0 and not self.RolloverZero:
+                    # an empty list can't be repeated; it limits the runs to zero instead
+                    continue
 
                 if self.RolloverZero:
-                    applyArgument.List += [""] * (maxOriginalLength - originalLength)
+                    applyArgument.List = Utils.ListView(applyArgument.List, maxOriginalLength, "")
                 else:
-                    while len(applyArgument.List) < maxOriginalLength:
-                        applyArgument.List.extend(applyArgument.List[:originalLength])
+                    # whole repetitions, like extending the list with itself until it's long enough
+                    repetitions = -(-maxOriginalLength // originalLength)
+                    applyArgument.List = Utils.ListView(applyArgument.List, originalLength * repetitions)
 
         if self.CrossJoin:
-            crossjoined = itertools.product(*[x.List for x in self.ApplyLists])
-            crossjoined = list(map(list, zip(*crossjoined))) # transpose
-
+            lists = [x.List for x in self.ApplyLists]
             for i in range(len(self.ApplyLists)):
-                self.ApplyLists[i].List = crossjoined[i]
+                self.ApplyLists[i].List = Utils.CrossJoinView(lists, i)
 
         try:
             minLength = min(len(x.List) for x in self.ApplyLists if not x.ShouldTranspose)
@@ -2091,7 +3528,7 @@ class GoConfig:
 
         for applyArgument in self.ApplyLists:
             if len(applyArgument.List) > minLength:
-                applyArgument.List = applyArgument.List[:minLength]
+                applyArgument.List = Utils.ListView.Truncate(applyArgument.List, minLength)
 
         # endregion
 
@@ -2148,10 +3585,7 @@ class GoConfig:
                             argument[j] = args
                     j += 1
 
-                argument = (Utils.RepeatGenerator(x, finalApplyLength) if isinstance(x, str) else x for x in argument)
-                result = list()
-                for rejoined in zip(*argument):
-                    result.append("".join(rejoined))
+                result = Utils.JoinedView([Utils.RepeatGenerator(x, finalApplyLength) if isinstance(x, str) else x for x in argument])
 
             newArguments[i] = result
             i += 1
@@ -2160,13 +3594,147 @@ class GoConfig:
 
         return newArguments
 
+    def _CompileModifiers(self, applyArgument: ApplyListSpecifier, lazy: bool) \
+            -> typing.List[typing.Callable[[typing.Iterable[str]], typing.Iterable[str]]]:
+        # consecutive per-element modifiers are chained maps, so they're applied in one pass over the list, with each
+        # element going through all of them before the next one is read; the other modifiers (filters, splits and
+        # the ones that need the whole list) are separate steps between them
+        steps = []
+        elementSteps: typing.List[typing.Callable[[str], str]] = []
+
+        def fuse():
+            if not elementSteps:
+                return
+            def step(items, functions=tuple(elementSteps)):
+                for function in functions:
+                    items = map(function, items)
+                return items if lazy else list(items)
+            steps.append(step)
+            elementSteps.clear()
+
+        def addStep(step):
+            fuse()
+            steps.append(step)
+
+        def addWholeListStep(func):
+            def step(items):
+                yield from func(list(items))
+            addStep(step)
+
+        for (modifierType, modifierArgument) in applyArgument.Modifiers:
+            if modifierType in {"d", "i"}:
+                # already processed
+                pass
+            elif modifierType == "e":
+                elementSteps.append(Utils.EscapeForShell)
+            elif modifierType == "f":
+                elementSteps.append(lambda x, format=modifierArgument: format % x)
+            elif modifierType == "fi":
+                elementSteps.append(lambda x, format=modifierArgument: format % int(x))
+            elif modifierType == "ff":
+                elementSteps.append(lambda x, format=modifierArgument: format % float(x))
+            elif modifierType == "fl":
+                addWholeListStep(lambda items, separator=modifierArgument: [separator.join(items)])
+            elif modifierType == "g":
+                addWholeListStep(lambda items, command=modifierArgument: Utils.CaptureGoOutput(command, items))
+            elif modifierType == "py":
+                (modulePath, moduleArgument) = modifierArgument
+                module = self._getOrInitExternalModule(modulePath)
+                addWholeListStep(lambda items, module=module, moduleArgument=moduleArgument:
+                                 module.ModifyApplyList(applyArgument, items, moduleArgument))
+            elif modifierType == "rep":
+                (old, new) = modifierArgument
+                elementSteps.append(lambda x, old=old, new=new: x.replace(old, new))
+            elif modifierType == "rm":
+                regex = re.compile(modifierArgument, re.I)
+                addStep(lambda items, regex=regex: filter(regex.search, items))
+            elif modifierType == "rs":
+                (groupNumber, regexString) = modifierArgument
+                regex = re.compile(regexString, re.I)
+                def replaceWithGroup(x, regex=regex, groupNumber=groupNumber):
+                    match = regex.search(x)
+                    if not match:
+                        return ""
+                    if groupNumber <= regex.groups:
+                        return match.groups()[groupNumber - 1]
+                    return match.group(0) # entire match
+                elementSteps.append(replaceWithGroup)
+            elif modifierType == "s":
+                (excludeInstead, expression) = modifierArgument
+                slices = []
+                for expr in expression.split(","):
+                    s = Utils.GetSliceFunc(expr)
+                    if s:
+                        slices.append(s)
+                addWholeListStep(lambda items, slices=slices, excludeInstead=excludeInstead:
+                                 Utils.ApplySlices(slices, items, excludeInstead))
+            elif modifierType == "sp":
+                regex = re.compile(modifierArgument)
+                addStep(lambda items, regex=regex: (x for t in items for x in regex.split(t) if len(x) > 0))
+            elif modifierType == "ss":
+                elementSteps.append(Utils.GetSliceFunc(modifierArgument))
+            elif modifierType == "strip":
+                side, characters = modifierArgument
+                side = (side or "").lower()
+                if side == "l":
+                    stripper = "lstrip"
+                elif side == "r":
+                    stripper = "rstrip"
+                else:
+                    stripper = "strip"
+                elementSteps.append(lambda x, stripper=getattr(str, stripper), characters=characters: stripper(x, characters))
+            elif modifierType == "tsp":
+                addWholeListStep(lambda items: [items])
+            elif modifierType == "w":
+                (inverted, pattern) = modifierArgument
+                # same as fnmatch.fnmatch, with the pattern translated only once
+                regex = re.compile(fnmatch.translate(os.path.normcase(pattern)))
+                addStep(lambda items, regex=regex, inverted=inverted:
+                        (x for x in items if (regex.match(os.path.normcase(x)) is not None) is not inverted))
+            elif modifierType == "xtr":
+                (groupNumber, pattern) = modifierArgument
+                regex = re.compile(pattern, re.I)
+                addStep(lambda items, regex=regex: (x for t in items for x in regex.findall(t)))
+
+        fuse()
+        return steps
+
+    def _StreamApplyRows(self, arguments: list) -> typing.Iterator[typing.Tuple[str, ...]]:
+        indexes = {id(x): i for (i, x) in enumerate(self.ApplyLists)}
+
+        def listIndex(item: typing.Union[InlineMarkerSpecifier, ApplyListSpecifier]) -> int:
+            return indexes[id(item.ApplyList if isinstance(item, InlineMarkerSpecifier) else item)]
+
+        getters = []
+        for argument in arguments:
+            if isinstance(argument, str):
+                getters.append(lambda row, text=argument: text)
+            elif isinstance(argument, InlineMarkerSpecifier) or isinstance(argument, ApplyListSpecifier):
+                getters.append(lambda row, index=listIndex(argument): row[index])
+            else:
+                parts = [(x, None) if isinstance(x, str) else (None, listIndex(x)) for x in argument if not isinstance(x, str) or len(x) > 0]
+                getters.append(lambda row, parts=parts: "".join(text if index is None else row[index] for (text, index) in parts))
+
+        if not getters:
+            # nothing references a list, so the target runs once, like with buffered lists
+            return iter([()])
+
+        # every list is zipped, even unreferenced ones, so the shortest list still limits the runs
+        return (tuple(getter(row) for getter in getters) for row in zip(*(x.List for x in self.ApplyLists)))
+
 
 class ParallelRunner:
-    def __init__(self, config: GoConfig):
+    # how many streamed runs can wait to be started; enqueueing blocks after that
+    _StreamQueueSize = 256
+
+    def __init__(self, config: GoConfig, streaming: bool = False):
         self._Configuration = config
 
         self._MaxParallel = None if self._Configuration.Batched else self._Configuration.ParallelLimit
 
+        self._Streaming = streaming
+        self._StreamQueue = queue.Queue(ParallelRunner._StreamQueueSize)
+        self._Enqueued = 0
         self._SubprocessArgs = []
         self._PrintArray = []
         self._PrintArrayLock = threading.Lock()
@@ -2177,13 +3745,37 @@ class ParallelRunner:
         Utils.TryInitColorama()
 
     def EnqueueRun(self, subprocessArgs: dict):
-        self._SubprocessArgs.append(subprocessArgs)
-
-    def Start(self):
-        self._Batchify()
+        self._Enqueued += 1
+        if self._Streaming:
+            self._StreamQueue.put(subprocessArgs)
+        else:
+            self._SubprocessArgs.append(subprocessArgs)
 
+    def StartStreaming(self):
+        # runs start as soon as they're enqueued; Start() then only waits for them
         self._MainRunnerThread.start()
         self._PrinterThread.start()
+
+    def Abort(self):
+        # drops the runs that didn't start yet, and waits for the others; used when enqueueing fails midway
+        if not self._Streaming or not self._MainRunnerThread.is_alive():
+            return
+
+        while True:
+            try:
+                self._StreamQueue.get_nowait()
+            except queue.Empty:
+                break
+        self.Start()
+
+    def Start(self):
+        if self._Streaming:
+            self._StreamQueue.put(None)
+        else:
+            self._Batchify()
+            self._MainRunnerThread.start()
+            self._PrinterThread.start()
+
         self._MainRunnerThread.join()
 
         self._PrinterThreadStopEvent = True
@@ -2194,17 +3786,23 @@ class ParallelRunner:
         self._SubprocessArgs = list(Utils.Batch(self._SubprocessArgs, batchSize))
 
     def _Runner(self):
-        for batch in self._SubprocessArgs:
+        batches = self._SubprocessArgs
+        if self._Streaming:
+            runs = iter(self._StreamQueue.get, None)
+            batches = Utils.Batch(runs, self._Configuration.ParallelLimit) if self._Configuration.Batched else [runs]
+
+        for batch in batches:
             self._RunBatch(batch)
 
-    def _RunBatch(self, batch: typing.List[dict]):
-        batchSize = len(batch)
-        parallelLimit = batchSize if self._MaxParallel is None else self._MaxParallel
+    def _RunBatch(self, batch: typing.Iterable[dict]):
+        parallelLimit = sys.maxsize if self._MaxParallel is None else self._MaxParallel
         semaphore = threading.Semaphore(parallelLimit)
         threads = []
 
         for run in batch:
             semaphore.acquire()
+            if len(threads) >= 1024:
+                threads = [x for x in threads if x.is_alive()]
 
             thread = threading.Thread(target=ParallelRunner._RunInstance,
                                       args=(dict(run), semaphore, self._PrintArray, self._PrintArrayLock, self._Configuration.Priority))
@@ -2260,13 +3858,514 @@ class ParallelRunner:
                 print("[{0:3d}]  {1}".format(i + 1, Utils.RemoveControlCharacters(output)))
 
             print("{0:3d} / {1:3d} done".format(sum(1 if x is None else 0 for x in self._PrintArray),
-                                                sum(len(x) for x in self._SubprocessArgs)))
+                                                self._Enqueued))
 
             time.sleep(0.25)
 
 
+class DirectoryWatcher():
+    # inotify through libc; every event only marks the directory it happened in as changed
+    IN_MODIFY = 0x2
+    IN_ATTRIB = 0x4
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_FROM = 0x40
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_MOVE_SELF = 0x800
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    IN_ONLYDIR = 0x1000000
+    IN_NONBLOCK = 0x800
+    IN_CLOEXEC = 0x80000
+
+    # a file's contents only matter for gofilters
+    _WatchMask = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | \
+                 IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+    _ContentEvents = IN_MODIFY | IN_CLOSE_WRITE
+    _Event = struct.Struct("iIII") # wd, mask, cookie, len; followed by the name
+
+    __libc = None
+    @staticmethod
+    def _GetLibc() -> typing.Optional[ctypes.CDLL]:
+        if DirectoryWatcher.__libc is None:
+            try:
+                libc = ctypes.CDLL(None, use_errno=True)
+                libc.inotify_init1.argtypes = [ctypes.c_int]
+                libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+                libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+                DirectoryWatcher.__libc = libc
+            except (OSError, AttributeError, TypeError):
+                DirectoryWatcher.__libc = False
+        return DirectoryWatcher.__libc or None
+
+    @staticmethod
+    def IsSupported() -> bool:
+        return sys.platform.startswith("linux") and DirectoryWatcher._GetLibc() is not None
+
+    def __init__(self):
+        self._Libc = DirectoryWatcher._GetLibc()
+        self._Fd = self._Libc.inotify_init1(DirectoryWatcher.IN_NONBLOCK | DirectoryWatcher.IN_CLOEXEC)
+        if self._Fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        # a single watch covers every path pointing to the same directory (eg. /bin and /usr/bin)
+        self._Paths: typing.Dict[str, int] = {}
+        self._Watches: typing.Dict[int, typing.Set[str]] = {}
+
+    def Watch(self, path: str) -> bool:
+        if path in self._Paths:
+            return True
+
+        wd = self._Libc.inotify_add_watch(self._Fd, os.fsencode(path), DirectoryWatcher._WatchMask)
+        if wd < 0:
+            return False
+
+        self._Paths[path] = wd
+        self._Watches.setdefault(wd, set()).add(path)
+        return True
+
+    def Unwatch(self, path: str):
+        wd = self._Paths.pop(path, None)
+        if wd is None:
+            return
+
+        paths = self._Watches[wd]
+        paths.discard(path)
+        if not paths:
+            del self._Watches[wd]
+            self._Libc.inotify_rm_watch(self._Fd, wd)
+
+    def Sync(self, paths: typing.Iterable[str]) -> typing.Tuple[typing.List[str], typing.List[str]]:
+        # watches exactly the given directories; returns the newly watched ones and the ones that can't be watched
+        paths = set(paths)
+        for path in [x for x in self._Paths if x not in paths]:
+            self.Unwatch(path)
+
+        added = []
+        failed = []
+        for path in paths:
+            if path in self._Paths:
+                continue
+            if self.Watch(path):
+                added.append(path)
+            else:
+                failed.append(path)
+        return (added, failed)
+
+    def ReadChanges(self) -> typing.Optional[typing.Set[str]]:
+        # drains the pending events; None means some were lost and anything may have changed
+        changed = set()
+        overflow = False
+        while True:
+            try:
+                data = os.read(self._Fd, 65536)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+
+            offset = 0
+            while offset < len(data):
+                (wd, mask, _, length) = DirectoryWatcher._Event.unpack_from(data, offset)
+                name = data[offset + DirectoryWatcher._Event.size:offset + DirectoryWatcher._Event.size + length]
+                offset += DirectoryWatcher._Event.size + length
+
+                if mask & DirectoryWatcher.IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                if mask & DirectoryWatcher._ContentEvents:
+                    name = name.rstrip(b"\0")
+                    if name != b".gofilter" and name != b"go.filter":
+                        continue
+
+                paths = self._Watches.get(wd, ())
+                changed.update(paths)
+                if mask & DirectoryWatcher.IN_IGNORED:
+                    # the watch is gone along with the directory
+                    for path in paths:
+                        self._Paths.pop(path, None)
+                    self._Watches.pop(wd, None)
+
+        return None if overflow else changed
+
+    def Close(self):
+        if self._Fd >= 0:
+            os.close(self._Fd)
+            self._Fd = -1
+        self._Paths.clear()
+        self._Watches.clear()
+
+
+class ResidentServer:
+    # settings sent along with every request; they decide both what gets scanned and how the target is matched
+    _RequestSettings = ["TargetedExtensions", "TargetedPaths", "IgnoredPaths", "IncludeAnyExecutables", "IncludeHidden",
+                        "IgnoreDuplicateLinks", "IgnoreGofilters", "FuzzyMatch", "RegexTargetMatch",
+                        "WildcardTargetMatch", "DirectoryFilter", "RefreshPathCache"]
+    _ConnectTimeout = 0.5
+    _RequestTimeout = 60
+    _ReadTimeout = 5 # for reading a request; clients send it as soon as they connect
+    _AcceptInterval = 0.5 # how often the accept loop checks for a stop request
+    _MaxWorkingDirectories = 16
+
+    class Slot():
+        # PATH and the targeted paths are kept apart from the working directory, which changes with every client
+        def __init__(self, pathVariable: str):
+            self.pathVariable = pathVariable
+            self.pathCache: typing.Optional[MatchCache] = None
+            self.targetedCache: typing.Optional[MatchCache] = None
+            self.rootStamps: typing.List[typing.Tuple[str, bool]] = []
+            self.workingDirectories: "collections.OrderedDict[str, MatchCache]" = collections.OrderedDict()
+            self.lastCheck = 0.0
+
+            # watched directories are only rescanned when an event arrives; the rest are polled
+            self.watcher: typing.Optional[DirectoryWatcher] = None
+            self.unwatched: typing.List[DirectoryCacheItem] = []
+            self.pendingChanges: typing.Set[str] = set()
+
+        def _GetRootStamps(self, config: GoConfig) -> typing.List[typing.Tuple[str, bool]]:
+            # targeted files aren't part of any directory stamp
+            return [(x, os.path.isfile(x)) for x in [*self.pathVariable.split(os.pathsep), *config.TargetedPaths]]
+
+        def _GetDirectories(self) -> typing.List[DirectoryCacheItem]:
+            matchCaches = [x for x in (self.pathCache, self.targetedCache) if x is not None]
+            matchCaches.extend(self.workingDirectories.values())
+            return [x for matchCache in matchCaches for x in matchCache.directories.values()]
+
+        @staticmethod
+        def _GetKnownDirectories(matchCache: typing.Optional[MatchCache], changed: typing.Set[str]) \
+                -> typing.Optional[typing.Dict[typing.Tuple[str, bool], DirectoryCacheItem]]:
+            if matchCache is None:
+                return None
+            return {key: x for (key, x) in matchCache.directories.items() if x.path not in changed}
+
+        @staticmethod
+        def _Scan(config: GoConfig, sources: typing.List[typing.Tuple[typing.List[str], bool, typing.Optional[typing.List[str]]]],
+                  knownDirectories: typing.Optional[typing.Dict[typing.Tuple[str, bool], DirectoryCacheItem]] = None) \
+                -> MatchCache:
+            # kept until its directories change, so the fuzzy scorer is built once for many lookups
+            matchCache = ScanSources(config, sources, knownDirectories)
+            matchCache.vectorized = True
+            return matchCache
+
+        def _Watch(self):
+            if self.watcher is None:
+                if not DirectoryWatcher.IsSupported():
+                    return
+                try:
+                    self.watcher = DirectoryWatcher()
+                except OSError as e:
+                    Cprint(">>>inotify unavailable (%s), polling directories instead" % e, level=-1)
+                    return
+
+            directories = self._GetDirectories()
+            (added, failed) = self.watcher.Sync(x.path for x in directories if not x.Missing)
+            if failed:
+                Cprint(">>>failed to watch %d directories, polling them instead" % len(failed), level=-1)
+
+            failed = set(failed)
+            added = set(added)
+            self.unwatched = [x for x in directories if x.Missing or x.path in failed]
+            # changes between the scan and the new watches
+            self.pendingChanges.update(x.path for x in directories if x.path in added and not x.IsUpToDate())
+
+        def Update(self, config: GoConfig, refresh: bool, changed: typing.Set[str] = frozenset()):
+            if refresh:
+                self.pathCache = None
+                self.targetedCache = None
+                self.workingDirectories.clear()
+
+            self.rootStamps = self._GetRootStamps(config)
+            self.pathCache = ResidentServer.Slot._Scan(config, [(self.pathVariable.split(os.pathsep), False, None)],
+                                                       ResidentServer.Slot._GetKnownDirectories(self.pathCache, changed))
+            self.targetedCache = ResidentServer.Slot._Scan(config, [(config.TargetedPaths, True, config.IgnoredPaths)],
+                                                           ResidentServer.Slot._GetKnownDirectories(self.targetedCache, changed))
+            self._Watch()
+
+        def Revalidate(self, config: GoConfig, poll: bool):
+            changed = self.pendingChanges
+            self.pendingChanges = set()
+            stale = False
+
+            if self.watcher is not None:
+                events = self.watcher.ReadChanges()
+                if events is None:
+                    Cprint(">>>inotify events were lost, rescanning everything", level=-1)
+                    self.Update(config, True)
+                    return
+                changed.update(events)
+
+            if poll:
+                directories = self.unwatched if self.watcher is not None else self._GetDirectories()
+                changed.update(x.path for x in directories if not x.IsUpToDate())
+                stale = self._GetRootStamps(config) != self.rootStamps
+
+            if not changed and not stale:
+                return
+
+            for (path, matchCache) in list(self.workingDirectories.items()):
+                if any(x.path in changed for x in matchCache.directories.values()):
+                    del self.workingDirectories[path]
+
+            indexed = set(x.path for matchCache in (self.pathCache, self.targetedCache)
+                          for x in matchCache.directories.values())
+            if stale or not changed.isdisjoint(indexed):
+                self.Update(config, False, changed)
+
+        def GetWorkingDirectory(self, config: GoConfig, path: str) -> MatchCache:
+            matchCache = self.workingDirectories.pop(path, None)
+            if matchCache is None or not all(x.IsUpToDate() for x in matchCache.directories.values()):
+                matchCache = ResidentServer.Slot._Scan(config, [([path], False, None)])
+                self.workingDirectories[path] = matchCache
+                while len(self.workingDirectories) > ResidentServer._MaxWorkingDirectories:
+                    self.workingDirectories.popitem(last=False)
+                self._Watch()
+            else:
+                self.workingDirectories[path] = matchCache
+            return matchCache
+
+        def Close(self):
+            if self.watcher is not None:
+                self.watcher.Close()
+                self.watcher = None
+
+    def __init__(self, config: GoConfig):
+        self._Configuration = config
+        self._Slots: "collections.OrderedDict[str, ResidentServer.Slot]" = collections.OrderedDict()
+        self._SlotsLock = threading.Lock()
+        self._Running = False
+
+    @staticmethod
+    def IsSupported() -> bool:
+        return hasattr(socket, "AF_UNIX") and hasattr(os, "getuid")
+
+    @staticmethod
+    def GetSocketPath() -> str:
+        directory = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+        return os.path.join(directory, "go-server-%d.sock" % os.getuid())
+
+    @staticmethod
+    def _Connect() -> typing.Optional[socket.socket]:
+        # only talk to a server started by the same user
+        socketPath = ResidentServer.GetSocketPath()
+        try:
+            s = os.stat(socketPath)
+        except OSError:
+            return None
+        if not stat.S_ISSOCK(s.st_mode) or s.st_uid != os.getuid():
+            return None
+
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(ResidentServer._ConnectTimeout)
+        try:
+            connection.connect(socketPath)
+        except OSError:
+            connection.close()
+            return None
+
+        connection.settimeout(ResidentServer._RequestTimeout)
+        return connection
+
+    @staticmethod
+    def _ReceiveAll(connection: socket.socket) -> bytes:
+        chunks = []
+        while (chunk := connection.recv(65536)):
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    @staticmethod
+    def _Exchange(connection: socket.socket, request: dict) -> dict:
+        # one json request per connection; the end of each message is marked by closing that direction
+        with connection:
+            connection.sendall(json.dumps(request).encode("utf-8"))
+            connection.shutdown(socket.SHUT_WR)
+            return json.loads(ResidentServer._ReceiveAll(connection).decode("utf-8"))
+
+    @staticmethod
+    def TryResolve(config: GoConfig, targets: typing.List[str], alternatives: bool = False) \
+            -> typing.Optional[typing.List[typing.Tuple[typing.List[str], typing.List[str]]]]:
+        if not ResidentServer.IsSupported():
+            return None
+        connection = ResidentServer._Connect()
+        if connection is None:
+            return None
+
+        request = {
+            "command": "resolve",
+            "targets": targets,
+            "alternatives": alternatives,
+            "cwd": os.getcwd(),
+            "path": os.environ.get("PATH", ""),
+            "settings": {x: getattr(config, x) for x in ResidentServer._RequestSettings}
+        }
+        try:
+            response = ResidentServer._Exchange(connection, request)
+        except (OSError, ValueError):
+            Cprint(">>>go server did not answer, searching locally...", level=1)
+            return None
+
+        if "error" in response:
+            Cprint(">>>go server failed: %s; searching locally..." % response["error"], level=1)
+            return None
+        return [(exactMatches, fuzzyMatches) for (exactMatches, fuzzyMatches) in response["results"]]
+
+    @staticmethod
+    def Stop():
+        connection = ResidentServer._Connect() if ResidentServer.IsSupported() else None
+        if connection is None:
+            Cprint(">>>no go server is running", level=2)
+            return
+
+        try:
+            ResidentServer._Exchange(connection, {"command": "stop"})
+        except (OSError, ValueError):
+            pass
+
+    def Serve(self) -> int:
+        if not ResidentServer.IsSupported():
+            Cprint(">>>/server requires unix domain sockets", level=2)
+            return -1
+
+        socketPath = ResidentServer.GetSocketPath()
+        existing = ResidentServer._Connect()
+        if existing is not None:
+            existing.close()
+            Cprint(">>>a go server is already running", level=2)
+            return -1
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            try:
+                # left behind by a server that didn't exit cleanly
+                os.remove(socketPath)
+            except OSError:
+                pass
+
+            oldUmask = os.umask(0o177)
+            try:
+                listener.bind(socketPath)
+            finally:
+                os.umask(oldUmask)
+        except OSError as e:
+            listener.close()
+            Cprint(">>>failed to create the go server socket: " + str(e), level=2)
+            return -1
+
+        try:
+            listener.listen(16)
+            Cprint(">>>go server listening on " + socketPath, level=1)
+
+            # every connection is read and answered on its own thread, so a slow or stalled client doesn't hold up
+            # the others; only resolving (which updates the indexes) is done one request at a time
+            listener.settimeout(ResidentServer._AcceptInterval)
+            self._Running = True
+            while self._Running:
+                try:
+                    (connection, _) = listener.accept()
+                except socket.timeout:
+                    continue
+                threading.Thread(target=self._Handle, args=(connection,), daemon=True).start()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            listener.close()
+            try:
+                os.remove(socketPath)
+            except OSError:
+                pass
+
+            with self._SlotsLock:
+                for slot in self._Slots.values():
+                    slot.Close()
+                self._Slots.clear()
+
+        return 0
+
+    def _Handle(self, connection: socket.socket):
+        with connection:
+            connection.settimeout(ResidentServer._ReadTimeout)
+            try:
+                request = json.loads(ResidentServer._ReceiveAll(connection).decode("utf-8"))
+                if request.get("command") == "stop":
+                    self._Running = False
+                    response = {}
+                else:
+                    with self._SlotsLock:
+                        response = {"results": self._Resolve(request)}
+            except Exception as e:
+                response = {"error": str(e)}
+
+            try:
+                connection.settimeout(ResidentServer._RequestTimeout)
+                connection.sendall(json.dumps(response).encode("utf-8"))
+            except OSError:
+                pass
+
+    def _GetSlot(self, config: GoConfig, pathVariable: str) -> "ResidentServer.Slot":
+        fingerprint = config.GetCacheFingerprint(pathVariable)
+        slot = self._Slots.pop(fingerprint, None)
+        if slot is None:
+            slot = ResidentServer.Slot(pathVariable)
+
+        self._Slots[fingerprint] = slot
+        while len(self._Slots) > config.CacheSlots:
+            (_, evicted) = self._Slots.popitem(last=False)
+            evicted.Close()
+
+        now = time.time()
+        if config.RefreshPathCache or slot.pathCache is None:
+            slot.Update(config, True)
+            slot.lastCheck = now
+        else:
+            poll = now - slot.lastCheck >= config.ServerRevalidationTime
+            slot.Revalidate(config, poll)
+            if poll:
+                slot.lastCheck = now
+        return slot
+
+    def _Resolve(self, request: dict) -> typing.List[typing.Tuple[typing.List[str], typing.List[str]]]:
+        config = copy.copy(self._Configuration)
+        for (key, value) in request["settings"].items():
+            if key in ResidentServer._RequestSettings:
+                setattr(config, key, value)
+        config.DirectoryFilter = [tuple(x) for x in config.DirectoryFilter]
+
+        slot = self._GetSlot(config, request["path"])
+        workingDirectory = slot.GetWorkingDirectory(config, request["cwd"])
+
+        # same order as a local scan: PATH, then the working directory, then the targeted paths
+        matchCaches = (slot.pathCache, workingDirectory, slot.targetedCache)
+
+        def findMatches(matcher: TargetMatcher, exactOnly: bool) -> typing.Tuple[typing.List[str], typing.List[str]]:
+            similarItems = []
+            for matchCache in matchCaches:
+                similarItems.extend(matcher.FindSimilarItems(matchCache, False, exactOnly))
+
+            # duplicates across the parts are removed like a local scan would, before the directory filter;
+            # a duplicate always has the same name, so it is among the similar items as well
+            ratios = {id(item): ratio for (item, ratio) in similarItems}
+            items = unique([item for (item, _) in similarItems], config.IgnoreDuplicateLinks)
+            return matcher.Rank((item, ratios[id(item)]) for item in items if matcher.PassesDirectoryFilter(item.path))
+
+        results = []
+        for target in request["targets"]:
+            matcher = TargetMatcher.FromConfig(config, target)
+            matches = None
+            if not request["alternatives"]:
+                matches = findMatches(matcher, True)
+                if not matches[0] and matcher.Suggests:
+                    matches = None
+            results.append(matches if matches is not None else findMatches(matcher, False))
+        return results
+
+
 def unique(lst: typing.List[MatchCacheItem], ignoreSymlinkDuplication: bool = True) -> typing.List[MatchCacheItem]:
+    # paths are already normalized by the scan; symlinks are compared by the file they point to, and the
+    # resolved path is only needed when that couldn't be stat'ed
     temp = {}
+    fileIds = set()
     symlinks = []
 
     for i in range(len(lst)):
@@ -2276,14 +4375,22 @@ def unique(lst: typing.List[MatchCacheItem], ignoreSymlinkDuplication: bool = Tr
             symlinks.append((i, item))
             continue
 
-        key = (os.path.normcase(os.path.normpath(item.path)), os.path.normcase(item.filename))
+        key = (os.path.normcase(item.path), os.path.normcase(item.filename))
         if key in temp:
             continue
 
         temp[key] = (i, item)
+        if item.fileId is not None:
+            fileIds.add((item.fileId, key[1]))
 
     for (i, item) in symlinks:
-        key = (os.path.normcase(os.path.normpath(item.linkTarget)), os.path.normcase(item.filename))
+        filename = os.path.normcase(item.filename)
+        if item.fileId is not None:
+            if (item.fileId, filename) in fileIds:
+                continue
+            fileIds.add((item.fileId, filename))
+
+        key = (os.path.normcase(item.linkTarget), filename)
         if key in temp:
             continue
         temp[key] = (i, item)
@@ -2293,92 +4400,338 @@ def unique(lst: typing.List[MatchCacheItem], ignoreSymlinkDuplication: bool = Tr
     return [item for (i, item) in asList]
 
 
-def FindMatchesAndAlternatives(config: GoConfig, target: str) -> typing.Tuple[typing.List[str], typing.List[str]]:
-    if os.path.abspath(target).lower() == target.lower():
-        return ([target], [])
+def GetResolutionMemo(config: GoConfig) -> typing.Optional[ResolutionMemo]:
+    if not config.UsePathCache or config.DisablePathCache or config.MemoSize <= 0:
+        return None
 
-    allFiles: typing.List[MatchCacheItem] = []
+    cacheDir = Utils.GetCacheDir()
+    if cacheDir is None:
+        return None
+    return ResolutionMemo(os.path.join(cacheDir, "memo.json"), config.MemoSize)
 
-    scriptDir = Utils.GetScriptDir()
-    if scriptDir is None:
-        Cprint(">>>failed to get script directory, ignoring cache...", level=2)
-        cachePath = None
-    else:
-        cachePath = os.path.join(scriptDir, "go.cache")
-    overwriteCache = config.RefreshPathCache and not config.DisablePathCache
 
-    if (config.UsePathCache and not config.DisablePathCache) and not config.RefreshPathCache:
-        if cachePath and os.path.isfile(cachePath):
-            success = False
+def GetCachePath(config: GoConfig) -> typing.Optional[str]:
+    # the slot's path, without a generation; see GetCacheGenerations
+    cacheDir = Utils.GetCacheDir()
+    if cacheDir is None:
+        Cprint(">>>failed to get a cache directory, ignoring cache...", level=2)
+        return None
+    return os.path.join(cacheDir, config.GetCacheFingerprint())
+
+
+def GetCacheGenerations(cachePath: str) -> typing.List[str]:
+    # every rebuild writes a new "<slot>.<generation>.cache" file instead of replacing the previous one in place:
+    # on windows, a file can't be replaced (or even renamed) while another go has it mapped, so os.replace
+    # would fail whenever a lookup is running; the superseded files are removed by EvictCacheSlots once unmapped
+    # returns the slot's files, oldest first
+    (cacheDir, slot) = os.path.split(cachePath)
+    try:
+        names = os.listdir(cacheDir)
+    except OSError:
+        return []
+    generations = [name for name in names if ParseCacheFileName(name)[0] == slot]
+    return [os.path.join(cacheDir, name) for name in sorted(generations)]
+
+
+def GetNewCacheGeneration(cachePath: str) -> str:
+    # fixed width, so that names sort in the order they were written
+    return "%s.%016x.cache" % (cachePath, time.time_ns())
+
+
+def ParseCacheFileName(name: str) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
+    # (slot, generation) of a cache file name; (None, None) for anything else in the cache directory
+    parts = name.split(".")
+    if len(parts) != 3 or parts[2] != "cache" or len(parts[1]) != 16:
+        return (None, None)
+    return (parts[0], parts[1])
+
+
+def EvictCacheSlots(config: GoConfig, cachePath: str):
+    # keeps the most recently used slots, within the configured count and total size;
+    # a slot's older generations are always removed, unless they're still mapped
+    cacheDir = os.path.dirname(cachePath)
+    generations: typing.Dict[str, typing.List[typing.Tuple[str, str, float, int]]] = {}
+    stale = []
+    locks: typing.Dict[str, str] = {}
+    now = time.time()
+    try:
+        with os.scandir(cacheDir) as it:
+            for entry in it:
+                if entry.name.endswith(".cache") and entry.is_file():
+                    (slot, generation) = ParseCacheFileName(entry.name)
+                    if slot is None:
+                        # written by an older go
+                        stale.append(entry.path)
+                        continue
+                    s = entry.stat()
+                    generations.setdefault(slot, []).append((generation, entry.path, s.st_mtime, s.st_size))
+                elif entry.name.endswith(".lock") and entry.is_file():
+                    locks[entry.name[:-len(".lock")]] = entry.path
+                elif entry.name.endswith(".tmp") and entry.is_file():
+                    # left behind by a go that died while writing
+                    try:
+                        if entry.stat().st_mtime < now - CACHE_REBUILD_TIMEOUT:
+                            os.remove(entry.path)
+                    except OSError:
+                        pass
+    except OSError:
+        return
+
+    slots = []
+    for (slot, files) in generations.items():
+        files.sort()
+        stale.extend(path for (_, path, _, _) in files[:-1])
+        (_, path, mtime, size) = files[-1]
+        slots.append((slot, path, mtime, size))
+
+    for path in stale:
+        try:
+            os.remove(path)
+        except OSError:
+            # still mapped by a running go (windows); the next eviction tries again
+            pass
+
+    currentSlot = os.path.basename(cachePath)
+    slots.sort(key=lambda x: (x[0] != currentSlot, -x[2]))
+    sizeLimit = config.CacheSizeLimit * 1024 * 1024
+    totalSize = 0
+    kept = {currentSlot}
+    for (i, (slot, path, _, size)) in enumerate(slots):
+        totalSize += size
+        if i == 0 or (i < config.CacheSlots and totalSize <= sizeLimit):
+            kept.add(slot)
+            continue
+
+        try:
+            os.remove(path)
+            Cprint(">>>removed least recently used path cache " + path, level=-1)
+        except OSError:
+            kept.add(slot)
+
+    # the locks of evicted slots (or of slots whose cache was never written); one that can't be taken right away
+    # belongs to a go that is building that slot now, and is left alone
+    for (slot, path) in locks.items():
+        if slot in kept:
+            continue
+        lock = FileLock(path)
+        try:
+            if lock.Acquire(0):
+                # released before removing it, since windows can't remove an open file
+                lock.Release()
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def ScanSources(config: GoConfig, sources: typing.List[typing.Tuple[typing.List[str], bool, typing.Optional[typing.List[str]]]],
+                knownDirectories: typing.Optional[typing.Dict[typing.Tuple[str, bool], DirectoryCacheItem]] = None) \
+        -> MatchCache:
+    allFiles: typing.List[MatchCacheItem] = []
+    with PathScanner(config.TargetedExtensions, config.IncludeAnyExecutables, config.IncludeHidden,
+                     config.IgnoreGofilters, knownDirectories, config.ScanThreads) as scanner:
+        for source in sources:
+            scanner.Prefetch(*source)
+        for source in sources:
+            allFiles.extend(scanner.ScanPaths(*source))
+
+    allFiles = unique(allFiles, config.IgnoreDuplicateLinks)
+    return MatchCache(time.time(), allFiles, scanner.ScannedDirectories)
+
+
+def GetMatchCache(config: GoConfig) -> typing.Union[MatchCache, MatchCacheFile]:
+    sources = [
+        (os.environ["PATH"].split(os.pathsep), False, None),
+        ([os.getcwd()], False, None),
+        (config.TargetedPaths, True, config.IgnoredPaths)
+    ]
+    if config.DisablePathCache or not (config.UsePathCache or config.RefreshPathCache):
+        return ScanSources(config, sources)
+
+    cachePath = GetCachePath(config)
+    if cachePath is None:
+        return ScanSources(config, sources)
+
+    cacheFile = None
+    if not config.RefreshPathCache:
+        cacheFile = OpenCacheFile(cachePath)
+        if cacheFile is not None and not IsCacheExpired(config, cacheFile):
+            return cacheFile
+
+    # one go rebuilds the cache; the others keep using the expired one, or wait for the new one if there's none
+    lock = FileLock(cachePath + ".lock")
+    try:
+        os.makedirs(os.path.dirname(cachePath), exist_ok=True)
+        locked = lock.Acquire(0)
+    except OSError:
+        Cprint(">>>failed to lock the path cache, ignoring cache...", level=1)
+        if cacheFile is not None:
+            cacheFile.Close()
+        return ScanSources(config, sources)
+
+    if not locked:
+        if cacheFile is not None:
+            Cprint(">>>path cache expired, but another go is rebuilding it; using the expired one...", level=-1)
+            return cacheFile
+
+        Cprint(">>>waiting for another go to build the path cache...", level=-1)
+        locked = lock.Acquire(CACHE_REBUILD_TIMEOUT)
+        if not config.RefreshPathCache:
+            cacheFile = OpenCacheFile(cachePath)
+            if cacheFile is not None and not IsCacheExpired(config, cacheFile):
+                lock.Release()
+                return cacheFile
+        if not locked:
+            Cprint(">>>timed out waiting for another go to build the path cache", level=1)
+
+    try:
+        # only rescan the directories that changed since the last refresh
+        knownDirectories = None
+        if cacheFile is not None:
             try:
-                with open(cachePath, "rb") as f:
-                    matchCache = pickle.load(f)
-                    assert isinstance(matchCache, MatchCache) and matchCache.GoodVersion()
-                    success = True
-            except:
-                overwriteCache = True
+                knownDirectories = cacheFile.directories
+            except Exception:
+                knownDirectories = None
+            finally:
+                cacheFile.Close()
 
-            if success:
-                lastRefresh = matchCache.timestamp
-                cachedPaths = matchCache.paths
+        matchCache = ScanSources(config, sources, knownDirectories)
+        try:
+            MatchCacheFile.Write(GetNewCacheGeneration(cachePath), matchCache)
+        except OSError:
+            Cprint(">>>failed to write the path cache", level=1)
+        EvictCacheSlots(config, cachePath)
+    finally:
+        lock.Release()
 
-                if lastRefresh < (time.time() - config.CacheInvalidationTime * 3600):
-                    overwriteCache = True
-                else:
-                    if not config.RefreshPathCache:
-                        allFiles.extend(cachedPaths)
-        else:
-            overwriteCache = True
-
-    if len(allFiles) == 0:
-        for (path, filename) in itertools.chain(
-                Utils.ParsePathsForFiles(os.environ["PATH"].split(os.pathsep), config.TargetedExtensions, False, config.IncludeAnyExecutables, config.IncludeHidden),
-                Utils.ParsePathsForFiles([os.getcwd()], config.TargetedExtensions, False, config.IncludeAnyExecutables, config.IncludeHidden),
-                Utils.ParsePathsForFiles(config.TargetedPaths, config.TargetedExtensions, True, config.IncludeAnyExecutables, config.IncludeHidden, config.IgnoredPaths)
-        ):
-            item = MatchCacheItem(path, filename)
-            if os.path.islink(path):
-                item.linkTarget = os.path.realpath(path)
-            allFiles.append(item)
-
-        allFiles = unique(allFiles, config.IgnoreDuplicateLinks)
-
-    if overwriteCache and cachePath:
-        with open(cachePath, "wb") as f:
-            matchCache = MatchCache(time.time(), allFiles)
-            pickle.dump(matchCache, f)
-
-    similarities = []
-    for item in allFiles:
-        passedThrough = True
-
-        for (include, directoryFilter) in config.DirectoryFilter:
-            (directory, _) = os.path.split(item.path)
-            directory = directory.lower()
-
-            if (include and directoryFilter.lower() not in directory) or \
-                    (not include and directoryFilter.lower() in directory):
-                passedThrough = False
-                break
+    return matchCache
 
-        if not passedThrough:
+
+def OpenCacheFile(cachePath: str) -> typing.Optional[MatchCacheFile]:
+    # the slot's newest generation; tried twice, since a rebuild can remove it right after it was listed
+    for _ in range(2):
+        generations = GetCacheGenerations(cachePath)
+        if not generations:
+            return None
+        try:
+            cacheFile = MatchCacheFile(generations[-1])
+        except FileNotFoundError:
             continue
+        except Exception:
+            # unreadable; it gets rebuilt
+            return None
+
+        try:
+            # the modification time tracks when the slot was last used
+            os.utime(generations[-1])
+        except OSError:
+            pass
+        return cacheFile
+    return None
+
+
+def IsCacheExpired(config: GoConfig, cacheFile: MatchCacheFile) -> bool:
+    return cacheFile.timestamp < (time.time() - config.CacheInvalidationTime * 3600)
+
+
+def FindFirstMatch(config: GoConfig, target: str) -> typing.Optional[str]:
+    # scans one directory at a time, in the same order as a full scan, until something matches exactly
+    exactOnly = not config.RegexTargetMatch and not config.WildcardTargetMatch
+    matcher = TargetMatcher(target, config.FuzzyMatch and not exactOnly, config.RegexTargetMatch,
+                            config.WildcardTargetMatch, config.DirectoryFilter)
+    sources = [
+        (os.environ["PATH"].split(os.pathsep), False, None),
+        ([os.getcwd()], False, None),
+        (config.TargetedPaths, True, config.IgnoredPaths)
+    ]
+
+    with PathScanner(config.TargetedExtensions, config.IncludeAnyExecutables, config.IncludeHidden,
+                     config.IgnoreGofilters) as scanner:
+        for source in sources:
+            for item in scanner.IterPaths(*source):
+                if matcher.PassesDirectoryFilter(item.path) and matcher.Score(item.filename) == 1:
+                    return item.path
+    return None
+
+
+def FindMatchesAndAlternatives(config: GoConfig, target: str, lazy: bool = False) \
+        -> typing.Tuple[typing.List[str], typing.List[str]]:
+    if os.path.abspath(target).lower() == target.lower():
+        return ([target], [])
+
+    if (lazy or config.LazyResolution) and not config.NthMatch:
+        firstMatch = FindFirstMatch(config, target)
+        if firstMatch is not None:
+            return ([firstMatch], [])
+        if not config.FuzzyMatch:
+            return ([], [])
+
+    if not config.DisablePathCache:
+        result = ResidentServer.TryResolve(config, [target])
+        if result is not None:
+            return result[0]
+
+    matchCache = GetMatchCache(config)
+    try:
+        return FindMatchesInCache(config, matchCache, target)
+    finally:
+        matchCache.Close()
+
+
+def FindAllMatchesAndAlternatives(config: GoConfig, targets: typing.List[str]) \
+        -> typing.List[typing.Tuple[typing.List[str], typing.List[str]]]:
+    # FindMatchesAndAlternatives for many targets, with the index loaded (or the server asked) only once;
+    # fuzzy alternatives are computed even for targets that have exact matches
+    results = [([target], []) for target in targets]
+    pending = [i for (i, target) in enumerate(targets) if os.path.abspath(target).lower() != target.lower()]
+    if len(pending) == 0:
+        return results
+
+    resolved = None
+    if not config.DisablePathCache:
+        resolved = ResidentServer.TryResolve(config, [targets[i] for i in pending], True)
+    if resolved is None:
+        matchCache = GetMatchCache(config)
+        try:
+            resolved = [FindMatchesInCache(config, matchCache, targets[i], True) for i in pending]
+        finally:
+            matchCache.Close()
+
+    for (i, result) in zip(pending, resolved):
+        results[i] = result
+    return results
+
+
+def FindMatchesInCache(config: GoConfig, matchCache: typing.Union[MatchCache, MatchCacheFile], target: str,
+                       alternatives: bool = False) -> typing.Tuple[typing.List[str], typing.List[str]]:
+    matcher = TargetMatcher.FromConfig(config, target)
 
-        similarities.append((item.path, Utils.ComparePathAndPattern(item.filename, target, config.FuzzyMatch,
-                                                                    config.RegexTargetMatch, config.WildcardTargetMatch)))
+    # exact matches come straight from the name index; suggestions are only computed when there are none,
+    # unless asked for
+    if not alternatives:
+        matches = matcher.Rank(matcher.FindSimilarItems(matchCache, exactOnly=True))
+        if matches[0] or not matcher.Suggests:
+            return matches
+    return matcher.Rank(matcher.FindSimilarItems(matchCache))
 
-    exactMatches = [x[0] for x in similarities if x[1] == 1.0]
 
-    fuzzyMatches = [x for x in similarities if x[1] >= 0.7 and x[1] < 1.0]
-    fuzzyMatches = sorted(fuzzyMatches, key=lambda x: x[1], reverse=True)
-    fuzzyMatches = fuzzyMatches[:5]
-    fuzzyMatches = [x[0] for x in fuzzyMatches]
+def GetDesiredMatch(config: GoConfig, target: str, lazy: bool = False) -> str | None:
+    if os.path.abspath(target).lower() == target.lower():
+        return target
+
+    memo = GetResolutionMemo(config)
+    memoKey = ResolutionMemo.GetKey(config, target, lazy) if memo is not None else None
+    if memo is not None and not config.RefreshPathCache:
+        if (memoized := memo.Get(memoKey)) is not None:
+            return memoized
 
-    return (exactMatches, fuzzyMatches)
+    match = FindDesiredMatch(config, target, lazy)
+    if memo is not None and match is not None:
+        memo.Put(memoKey, match)
+    return match
 
 
-def GetDesiredMatch(config: GoConfig, target: str) -> str | None:
-    (exactMatches, fuzzyMatches) = FindMatchesAndAlternatives(config, target)
+def FindDesiredMatch(config: GoConfig, target: str, lazy: bool) -> str | None:
+    (exactMatches, fuzzyMatches) = FindMatchesAndAlternatives(config, target, lazy)
 
     if len(exactMatches) == 0:
         Cprint(">>>no matches found for \"{0}\"!".format(target), level=2)
@@ -2417,20 +4770,94 @@ def GetDesiredMatch(config: GoConfig, target: str) -> str | None:
     return exactMatches[0]
 
 
+def Which(config: GoConfig, targets: typing.List[str]) -> int:
+    if len(targets) == 0:
+        if config.WhichFormat == "nul":
+            targets = [os.fsdecode(x) for x in sys.stdin.buffer.read().split(b"\0") if x]
+        else:
+            targets = [x for x in sys.stdin.read().splitlines() if x]
+
+    nthMatch = config.NthMatch
+    if nthMatch is None and config.FirstMatchFromConfig:
+        nthMatch = 0
+
+    results = []
+    for (target, (exactMatches, fuzzyMatches)) in zip(targets, FindAllMatchesAndAlternatives(config, targets)):
+        # same choice as FindDesiredMatch
+        match = None
+        if len(exactMatches) == 0:
+            status = "missing"
+        elif len(exactMatches) > 1 and (nthMatch is None or nthMatch >= len(exactMatches)):
+            status = "ambiguous"
+        else:
+            status = "found"
+            match = exactMatches[nthMatch if len(exactMatches) > 1 else 0]
+
+        results.append({"target": target, "status": status, "match": match,
+                        "exact": exactMatches, "fuzzy": fuzzyMatches})
+
+    if config.WhichFormat == "nul":
+        fields = []
+        for result in results:
+            fields.extend([result["target"], result["status"], result["match"] or ""])
+            fields.extend([str(len(result["exact"])), *result["exact"]])
+            fields.extend([str(len(result["fuzzy"])), *result["fuzzy"]])
+        sys.stdout.buffer.write(b"".join(os.fsencode(x) + b"\0" for x in fields))
+        sys.stdout.buffer.flush()
+    else:
+        print(json.dumps(results))
+
+    return 0 if all(x["status"] == "found" for x in results) else 1
+
+
+def Complete(config: GoConfig, prefix: str) -> int:
+    # completion can't wait for a rescan, so an expired cache is still used as it is
+    if config.DisablePathCache:
+        # a scan for every completion is too slow, and there's nowhere to keep it
+        return 0
+    cachePath = GetCachePath(config)
+    if cachePath is None:
+        return 0
+
+    matchCache = OpenCacheFile(cachePath) if not config.RefreshPathCache else None
+    if matchCache is None:
+        # missing slot; built and written once, as /cache would, so the next completions can use it
+        cacheConfig = copy.copy(config)
+        cacheConfig.UsePathCache = True
+        matchCache = GetMatchCache(cacheConfig)
+
+    try:
+        names = matchCache.GetNamesWithPrefix(prefix)
+        if names:
+            print("\n".join(names))
+    finally:
+        matchCache.Close()
+    return 0
+
+
 def echoTarget(target: str, arguments: typing.List[str], unsafe: bool = False):
     print(Utils.JoinForShell([target, *arguments], not unsafe))
 
 def Run(config: GoConfig, goTarget: str,
-        targetArguments: typing.List[typing.Union[typing.List[str], Utils.RepeatGenerator]]) \
+        targetArguments: typing.Union[typing.List[typing.Union[typing.List[str], Utils.RepeatGenerator]],
+                                      typing.Iterator[typing.Tuple[str, ...]]]) \
         -> typing.Optional[int]:
-    runs = 1
-    if config.RepeatCount is not None and len(targetArguments) == 0:
-        runs = config.RepeatCount
-    elif len(targetArguments) != 0:
-        runs = len(targetArguments[0])
+    if config.StreamApply:
+        # targetArguments are rows; only the prompt looks ahead, everything else runs as soon as it arrives
+        rows = iter(targetArguments)
+        head = [] if config.AlwaysYes else list(itertools.islice(rows, 51))
+        runs = len(head)
+        rows = itertools.chain(head, rows)
+    else:
+        runs = 1
+        if config.RepeatCount is not None and len(targetArguments) == 0:
+            runs = config.RepeatCount
+        elif len(targetArguments) != 0:
+            runs = len(targetArguments[0])
+        rows = zip(*targetArguments) if len(targetArguments) > 0 else [[]]
 
     if runs > 50 and not config.AlwaysYes:
-        Cprint(">>>{0} lines present at source. continue? (Y/n)".format(runs), level=2)
+        Cprint(">>>{0} lines present at source. continue? (Y/n)".format("more than 50" if config.StreamApply else runs), level=2)
         if not sys.stdin.isatty():
             Cprint(">>>stdin is piped. Please use /yes to run", level=2)
             return -1
@@ -2447,9 +4874,9 @@ def Run(config: GoConfig, goTarget: str,
 
     if config.AsShellScript:
         if Utils.IsWindows():
-            target = GetDesiredMatch(config, "cmd.exe")
+            target = GetDesiredMatch(config, "cmd.exe", True)
         else:
-            target = GetDesiredMatch(config, "bash")
+            target = GetDesiredMatch(config, "bash", True)
     elif config.Shell:
         target = goTarget
     else:
@@ -2458,9 +4885,14 @@ def Run(config: GoConfig, goTarget: str,
     if target is None:
         return -1
 
-    parallelRunner = ParallelRunner(config) if config.Parallel else None
+    # crossjoined rows are generated lazily, so feed them to the runner as they come, instead of storing all of them
+    streamRuns = config.StreamApply or config.CrossJoin
+    parallelRunner = ParallelRunner(config, streamRuns) if config.Parallel else None
     runMethod = subprocess.run if config.WaitForExit else subprocess.Popen
     stdin = sys.stdin if config.WaitForExit else subprocess.DEVNULL
+    if config.StreamApply and any(x.SourceType == "p" for x in config.ApplyLists):
+        # stdin is still being read for the apply lists
+        stdin = subprocess.DEVNULL
     stdout = sys.stdout if config.WaitForExit else subprocess.DEVNULL
     stderr = sys.stderr if config.WaitForExit else subprocess.DEVNULL
     flags = 0
@@ -2493,33 +4925,49 @@ def Run(config: GoConfig, goTarget: str,
     shouldEchoSuccess = config.EchoTarget and config.EchoWhen == EchoWhenValues.Success and can_print(2)
     shouldEchoFail = config.EchoTarget and config.EchoWhen == EchoWhenValues.Failure and can_print(2)
 
-    for arguments in (zip(*targetArguments) if len(targetArguments) > 0 else [[]]):
-        if shouldEchoAlways:
-            echoTarget(echoedActualTarget, arguments, config.Unsafe)
-        if config.DryRun:
-            continue
-        if config.AsShellScript:
-            asscriptArguments.append([goTarget] + list(arguments))
-            continue
+    if parallelRunner is not None and streamRuns and not config.DryRun:
+        parallelRunner.StartStreaming()
+
+    streamedRuns = 0
+    returnCode = None
+    try:
+        for arguments in rows:
+            if shouldEchoAlways:
+                echoTarget(echoedActualTarget, arguments, config.Unsafe)
+            if config.DryRun:
+                continue
+            if config.AsShellScript:
+                asscriptArguments.append([goTarget] + list(arguments))
+                continue
 
-        runArgument = [target, *arguments]
-        if config.Unsafe:
-            runArgument = Utils.JoinForShell(runArgument, False)
+            runArgument = [target, *arguments]
+            if config.Unsafe:
+                runArgument = Utils.JoinForShell(runArgument, False)
 
-        subprocessArgs = {"args": runArgument, "shell": config.Shell, "cwd": directory, "creationflags": flags,
-                          "stdin": stdin, "stdout": stdout, "stderr": stderr, "start_new_session": not config.WaitForExit}
+            subprocessArgs = {"args": runArgument, "shell": config.Shell, "cwd": directory, "creationflags": flags,
+                              "stdin": stdin, "stdout": stdout, "stderr": stderr, "start_new_session": not config.WaitForExit}
 
-        if config.Parallel:
-            parallelRunner.EnqueueRun(subprocessArgs)
-        else:
-            with Utils.PriorityModifier(*config.Priority):
-                process = runMethod(**subprocessArgs)
-            if config.WaitForExit:
-                returnCode = process.returncode
-                if (returnCode == 0 and shouldEchoSuccess) or (returnCode != 0 and shouldEchoFail):
-                    echoTarget(echoedActualTarget, arguments, config.Unsafe)
-                if runs == 1:
-                    return returnCode
+            if config.Parallel:
+                parallelRunner.EnqueueRun(subprocessArgs)
+            else:
+                with Utils.PriorityModifier(*config.Priority):
+                    process = runMethod(**subprocessArgs)
+                if config.WaitForExit:
+                    returnCode = process.returncode
+                    streamedRuns += 1
+                    if (returnCode == 0 and shouldEchoSuccess) or (returnCode != 0 and shouldEchoFail):
+                        echoTarget(echoedActualTarget, arguments, config.Unsafe)
+                    if runs == 1:
+                        return returnCode
+    except BaseException:
+        if parallelRunner is not None:
+            # otherwise the runner thread waits for more runs forever
+            parallelRunner.Abort()
+        raise
+
+    if config.StreamApply and streamedRuns == 1:
+        # the row count wasn't known up front
+        return returnCode
 
     if config.PrintTarget:
         print(target)
@@ -2556,6 +5004,19 @@ def main():
             break
         i += 1
 
+    if config.StopServer:
+        ResidentServer.Stop()
+        return 0
+    if config.RunServer:
+        return ResidentServer(config).Serve()
+
+    if config.WhichFormat is not None:
+        if not config.Validate():
+            return -1
+        return Which(config, args[i:])
+    if config.CompletionPrefix is not None:
+        return Complete(config, config.CompletionPrefix)
+
     if i == len(args):
         PrintHelp()
         return 0
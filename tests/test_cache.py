@@ -0,0 +1,119 @@
+import importlib.util
+import os
+import stat
+import tempfile
+import unittest
+
+_GoPath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "go.py")
+_Spec = importlib.util.spec_from_file_location("go", _GoPath)
+go = importlib.util.module_from_spec(_Spec)
+_Spec.loader.exec_module(go)
+
+
+class ScanTestCase(unittest.TestCase):
+    Files = ["tool", "tool.sh", "other", "ünïcödé", "a/nested", "a/skip/hidden", "a/skipper/shown", "a/keep/tool",
+             "b/ignored.sh"]
+
+    def setUp(self):
+        self._Directory = tempfile.TemporaryDirectory()
+        self.root = self._Directory.name
+        for file in self.Files:
+            path = os.path.join(self.root, *file.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write("#!/bin/sh\n")
+            os.chmod(path, stat.S_IRWXU)
+
+        go.config = self.config = go.GoConfig()
+        self.config.IncludeAnyExecutables = True
+
+    def tearDown(self):
+        self._Directory.cleanup()
+
+    def Scan(self, ignoredPaths=None) -> "go.MatchCache":
+        return go.ScanSources(self.config, [([self.root], True, ignoredPaths)])
+
+    def Relative(self, items) -> list:
+        return sorted(os.path.relpath(x.path, self.root).replace(os.sep, "/") for x in items)
+
+
+class MatchCacheFileTests(ScanTestCase):
+    def _WriteAndOpen(self, matchCache: "go.MatchCache") -> "go.MatchCacheFile":
+        path = os.path.join(self.root, "test.cache")
+        go.MatchCacheFile.Write(path, matchCache)
+        cacheFile = go.MatchCacheFile(path)
+        self.addCleanup(cacheFile.Close)
+        return cacheFile
+
+    def test_RoundTrip(self):
+        matchCache = self.Scan()
+        cacheFile = self._WriteAndOpen(matchCache)
+
+        self.assertEqual(cacheFile.timestamp, matchCache.timestamp)
+        self.assertEqual([(x.path, x.filename) for x in cacheFile.paths], [(x.path, x.filename) for x in matchCache.paths])
+        self.assertEqual(sorted(cacheFile.directories), sorted(matchCache.directories))
+        for (key, directory) in matchCache.directories.items():
+            self.assertEqual(cacheFile.directories[key].stamp, directory.stamp)
+            self.assertEqual(sorted(cacheFile.directories[key].directories), sorted(directory.directories))
+
+    def test_Lookup(self):
+        matchCache = self.Scan()
+        cacheFile = self._WriteAndOpen(matchCache)
+
+        for name in ["tool", "TOOL", "tool.sh", "ünïcödé", "nested", "missing", ""]:
+            self.assertEqual(self.Relative(cacheFile.Lookup(name)), self.Relative(matchCache.Lookup(name)), name)
+        self.assertEqual(self.Relative(cacheFile.Lookup("tool")), ["a/keep/tool", "tool", "tool.sh"])
+
+    def test_NamesWithPrefix(self):
+        cacheFile = self._WriteAndOpen(self.Scan())
+        self.assertEqual(cacheFile.GetNamesWithPrefix("to"), ["tool", "tool.sh"])
+        self.assertEqual(cacheFile.GetNamesWithPrefix("zzz"), [])
+
+    def test_FuzzyMatches(self):
+        matchCache = self.Scan()
+        cacheFile = self._WriteAndOpen(matchCache)
+
+        for target in ["tol", "othr", "unicode", "nestde"]:
+            matcher = go.TargetMatcher(target, True, False, False)
+            expected = [(x.path, ratio) for (x, ratio) in matchCache.GetFuzzyMatches(matcher)]
+            self.assertEqual([(x.path, ratio) for (x, ratio) in cacheFile.GetFuzzyMatches(matcher)], expected, target)
+
+    def test_RejectsOtherFiles(self):
+        path = os.path.join(self.root, "bad.cache")
+        with open(path, "wb") as f:
+            f.write(b"NOTACACHE" + bytes(64))
+        with self.assertRaises(ValueError):
+            go.MatchCacheFile(path)
+
+        # a cache cut short
+        go.MatchCacheFile.Write(path, self.Scan())
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) // 2)
+        with self.assertRaises(ValueError):
+            go.MatchCacheFile(path)
+
+
+class IgnoredPathsTests(ScanTestCase):
+    def test_IgnoredDirectory(self):
+        found = self.Relative(self.Scan([os.path.join(self.root, "a", "skip")]).paths)
+        self.assertNotIn("a/skip/hidden", found)
+        # a directory sharing the ignored one's prefix is still scanned
+        self.assertIn("a/skipper/shown", found)
+        self.assertIn("a/keep/tool", found)
+
+    def test_IgnoredFile(self):
+        found = self.Relative(self.Scan([os.path.join(self.root, "b", "ignored.sh")]).paths)
+        self.assertNotIn("b/ignored.sh", found)
+        self.assertIn("tool.sh", found)
+
+    def test_IgnoredParent(self):
+        found = self.Relative(self.Scan([os.path.join(self.root, "a")]).paths)
+        self.assertEqual([x for x in found if x.startswith("a/")], [])
+        self.assertIn("tool", found)
+
+    def test_NothingIgnored(self):
+        self.assertEqual(self.Relative(self.Scan([os.path.join(self.root, "missing")]).paths), sorted(self.Files))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import typing
+import unittest
+
+_RootPath = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# runs go in a child interpreter, so a hung runner thread can't also hang the test run
+_RunScript = textwrap.dedent("""
+    import sys
+    sys.path.insert(0, sys.argv[1])
+    import go
+
+    class FailingRows:
+        # yields a few rows, then fails like a bad modifier or an interrupt would
+        def __init__(self, count, failAfter):
+            self.count = count
+            self.failAfter = failAfter
+
+        def __len__(self):
+            return self.count
+
+        def __iter__(self):
+            for i in range(self.failAfter):
+                yield str(i)
+            raise ValueError("row %d" % self.failAfter)
+
+    config = go.GoConfig()
+    for argument in ["/qmax", "/yes", "/shell", "/parallel", *sys.argv[4:]]:
+        assert config.TryParseArgument(argument), argument
+    go.config = config
+
+    count, failAfter = int(sys.argv[2]), int(sys.argv[3])
+    if config.CrossJoin:
+        rows = [FailingRows(count, failAfter)]
+    else:
+        rows = ((x,) for x in FailingRows(count, failAfter))
+    go.Run(config, "true", rows)
+""")
+
+
+class ParallelRunnerFailureTests(unittest.TestCase):
+    def _Run(self, arguments: typing.List[str], input: bytes = b"") -> subprocess.CompletedProcess:
+        with tempfile.TemporaryDirectory() as cacheDirectory:
+            environment = dict(os.environ, XDG_CACHE_HOME=cacheDirectory)
+            try:
+                result = subprocess.run([sys.executable, *arguments], input=input, stdout=subprocess.PIPE,
+                                        stderr=subprocess.PIPE, env=environment, timeout=30)
+            except subprocess.TimeoutExpired:
+                self.fail("go didn't exit after a row failed")
+
+        self.assertNotEqual(result.returncode, 0)
+        return result
+
+    def _RunFailingRows(self, count: int, failAfter: int, *arguments: str):
+        result = self._Run(["-c", _RunScript, _RootPath, str(count), str(failAfter), *arguments])
+        self.assertIn(b"ValueError: row %d" % failAfter, result.stderr)
+
+    def test_StreamedRowFails(self):
+        self._RunFailingRows(10, 3, "/stream", "/limit-2")
+
+    def test_CrossJoinedRowFails(self):
+        # crossjoined runs go through the same lazily fed runner
+        self._RunFailingRows(10, 3, "/crossjoin", "/limit-2")
+
+    def test_FailureBeforeAnyRun(self):
+        self._RunFailingRows(10, 0, "/stream")
+
+    def test_StreamedModifierFails(self):
+        self._Run([os.path.join(_RootPath, "go.py"), "/qmax", "/yes", "/nth-0", "/stream", "/parallel",
+                   "/papply+[fi:%d]", "true"], b"a\nb\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import importlib.util
+import io
+import itertools
+import os
+import unittest
+
+_GoPath = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "go.py")
+_Spec = importlib.util.spec_from_file_location("go", _GoPath)
+go = importlib.util.module_from_spec(_Spec)
+_Spec.loader.exec_module(go)
+
+Utils = go.Utils
+
+
+class CompactStringListTests(unittest.TestCase):
+    Items = ["", "a", "ascii", "ünïcödé", "日本語", "\U0001F600", "\ud800", "x\udfffy", "", "tail"]
+
+    def test_RoundTrip(self):
+        items = Utils.CompactStringList(self.Items)
+        self.assertEqual(len(items), len(self.Items))
+        self.assertEqual(list(items), self.Items)
+        self.assertEqual([items[i] for i in range(len(self.Items))], self.Items)
+
+    def test_NegativeIndex(self):
+        items = Utils.CompactStringList(self.Items)
+        for i in range(1, len(self.Items) + 1):
+            self.assertEqual(items[-i], self.Items[-i])
+        with self.assertRaises(IndexError):
+            items[-len(self.Items) - 1]
+        with self.assertRaises(IndexError):
+            items[len(self.Items)]
+
+    def test_Slicing(self):
+        items = Utils.CompactStringList(self.Items)
+        for s in [slice(None), slice(2, 5), slice(-3, None), slice(None, None, -1), slice(1, 9, 3), slice(20, 30)]:
+            self.assertEqual(items[s], self.Items[s], s)
+
+    def test_Empty(self):
+        items = Utils.CompactStringList()
+        self.assertEqual(len(items), 0)
+        self.assertEqual(list(items), [])
+        self.assertEqual(items[:], [])
+
+    def test_ChunkBoundaries(self):
+        # ascii and non-ascii chunks, with strings ending exactly on and right around a chunk's end
+        chunkSize = Utils.CompactStringList._ChunkSize
+        for count in [chunkSize - 1, chunkSize, chunkSize + 1, 3 * chunkSize]:
+            for nonAscii in [None, 0, chunkSize - 1, chunkSize, count - 1]:
+                expected = [str(i) for i in range(count)]
+                if nonAscii is not None and nonAscii < count:
+                    expected[nonAscii] = "é\ud800%d" % nonAscii
+                items = Utils.CompactStringList(expected)
+                self.assertEqual(list(items), expected, (count, nonAscii))
+                self.assertEqual(items[count - 1], expected[-1])
+                self.assertEqual(items[-chunkSize:], expected[-chunkSize:])
+
+    def test_ExtendAcrossChunks(self):
+        expected = ["%dä" % i if i % 7 == 0 else str(i) for i in range(70000)]
+        items = Utils.CompactStringList(expected[:100])
+        items.Extend(iter(expected[100:]))
+        self.assertEqual(list(items), expected)
+        self.assertEqual(items[16 * Utils.CompactStringList._ChunkSize], expected[16 * Utils.CompactStringList._ChunkSize])
+
+    def test_FromLines(self):
+        text = "a\n\nb\nünï\n" * 5 + "last"
+        for skipEmpty in [False, True]:
+            expected = [x for x in text.split("\n") if x or not skipEmpty]
+            self.assertEqual(list(Utils.CompactStringList.FromLines(io.StringIO(text), skipEmpty)), expected)
+
+
+class CrossJoinViewTests(unittest.TestCase):
+    def _Check(self, lists):
+        expected = list(itertools.product(*lists))
+        columns = [Utils.CrossJoinView(lists, i) for i in range(len(lists))]
+        for (i, column) in enumerate(columns):
+            self.assertEqual(len(column), len(expected))
+            self.assertEqual(list(column), [x[i] for x in expected])
+            self.assertEqual([column[j] for j in range(len(expected))], [x[i] for x in expected])
+            self.assertEqual([column[-j] for j in range(1, len(expected) + 1)], [x[i] for x in expected[::-1]])
+            self.assertEqual(column[1:7:2], [x[i] for x in expected[1:7:2]])
+        self.assertEqual(list(zip(*columns)), expected)
+
+    def test_MatchesProduct(self):
+        self._Check([["a", "b"], ["1", "2", "3"], ["x", "y"]])
+        self._Check([["only"]])
+        self._Check([["a", "b", "c"], ["1"]])
+
+    def test_EmptyList(self):
+        lists = [["a", "b"], []]
+        for i in range(len(lists)):
+            column = Utils.CrossJoinView(lists, i)
+            self.assertEqual(len(column), 0)
+            self.assertEqual(list(column), [])
+            with self.assertRaises(IndexError):
+                column[0]
+
+    def test_OutOfRange(self):
+        column = Utils.CrossJoinView([["a", "b"], ["1", "2"]], 0)
+        with self.assertRaises(IndexError):
+            column[4]
+        with self.assertRaises(IndexError):
+            column[-5]
+
+
+class ListViewTests(unittest.TestCase):
+    def test_Repeat(self):
+        items = ["a", "b", "c"]
+        for count in [0, 1, 3, 4, 7, 9]:
+            view = Utils.ListView(items, count)
+            expected = (items * 4)[:count]
+            self.assertEqual(len(view), count)
+            self.assertEqual(list(view), expected)
+            self.assertEqual([view[i] for i in range(count)], expected)
+            if count:
+                self.assertEqual(view[-1], expected[-1])
+
+    def test_Padding(self):
+        view = Utils.ListView(["a", "b"], 5, "")
+        self.assertEqual(list(view), ["a", "b", "", "", ""])
+        self.assertEqual([view[i] for i in range(5)], ["a", "b", "", "", ""])
+        self.assertEqual(view[-4], "b")
+
+    def test_EmptyList(self):
+        # nothing to repeat, but padding still fills the view
+        self.assertEqual(len(Utils.ListView([], 5)), 0)
+        self.assertEqual(list(Utils.ListView([], 5)), [])
+        self.assertEqual(list(Utils.ListView([], 3, "")), ["", "", ""])
+
+    def test_OutOfRange(self):
+        view = Utils.ListView(["a"], 2)
+        with self.assertRaises(IndexError):
+            view[2]
+        with self.assertRaises(IndexError):
+            view[-3]
+
+    def test_Truncate(self):
+        items = ["a", "b", "c"]
+        self.assertEqual(list(Utils.ListView.Truncate(items, 2)), ["a", "b"])
+        repeated = Utils.ListView(items, 8)
+        self.assertEqual(list(Utils.ListView.Truncate(repeated, 5)), ["a", "b", "c", "a", "b"])
+        padded = Utils.ListView(items, 8, "")
+        self.assertEqual(list(Utils.ListView.Truncate(padded, 5)), ["a", "b", "c", "", ""])
+
+
+if __name__ == "__main__":
+    unittest.main()